@@ -1,3 +1,5 @@
+import os
+
 import streamlit as st
 
 from components.case_percentage_by_general_health import \
@@ -9,17 +11,55 @@ from components.case_ratio_smoking_vs_vape import \
 from components.cases_by_physical_activities import \
     render_cases_by_physical_activities
 from components.cases_by_sleep_hours import render_cases_by_sleep_hours
+from components.condition_comparison import render_condition_comparison
+from components.filter_panel import render_filter_panel
+from components.measure_distribution import render_measure_distribution
+from components.risk_factor_ranking import render_risk_factor_ranking
 from components.risk_percentage_by_age import render_risk_percentage_by_age
 from components.smoking_alcohol_interaction import \
     render_smoking_alcohol_interaction
-from components.us_map import render_us_map
+from components.us_map import describe_selection, render_us_map
 from constants.conditions import CONDITION_LABELS
-from services.data_loader import load_data
+from constants.us_states import CENSUS_REGIONS
+from services.aggregates import AggregateCube
+from services.aggregates_api import serve_in_background
+from services.data_source import (load_dashboard_cubes,
+                                  load_dashboard_filter_indexes)
+from services.instrumentation import (profile_phase, render_profile_sidebar,
+                                      report_first_render, set_render_context,
+                                      start_fragment_run, start_render_run)
+from services.warm_up import start_warm_up, warm_up_status
+
+# Sections below the fold only compute when their group is picked.
+DETAIL_SECTION_GROUPS = {
+    "Demographics": [
+        render_risk_percentage_by_age,
+        render_case_proportion_by_sex_age,
+    ],
+    "Lifestyle": [
+        render_cases_by_sleep_hours,
+        render_smoking_alcohol_interaction,
+        render_case_ratio_smoking_vs_vape,
+        render_cases_by_physical_activities,
+    ],
+    "General Health": [render_case_percentage_by_general_health],
+    "Distributions": [render_measure_distribution],
+    "Risk Factors": [render_risk_factor_ranking],
+    "Compare Conditions": [render_condition_comparison],
+}
 
 if "selected_state" not in st.session_state:
     st.session_state.selected_state = None
 
-df = load_data("data/heart_2022_no_nans.csv")
+start_warm_up()
+render_run = start_render_run()
+
+with profile_phase("data", "load"):
+    cubes = load_dashboard_cubes()
+    filter_indexes = load_dashboard_filter_indexes()
+
+if os.environ.get("AGGREGATES_API_PORT"):
+    serve_in_background(int(os.environ["AGGREGATES_API_PORT"]))
 
 st.set_page_config(page_title="U.S. Health Visualization", page_icon="♥️", layout="wide")
 
@@ -46,7 +86,26 @@ An interactive exploration of how lifestyle choices and personal health indicato
 """
 )
 
-st.markdown("## 2022 Overview 📅")
+year_title_col, year_selector_col = st.columns([3, 2], vertical_alignment="center")
+
+years = sorted(cubes, key=lambda year: -1 if year is None else year, reverse=True)
+
+with year_selector_col:
+    selected_year = st.selectbox(
+        "Select year:",
+        options=years,
+        format_func=lambda x: "All Data" if x is None else str(x),
+        label_visibility="collapsed",
+    )
+with year_title_col:
+    st.markdown(f"## {selected_year or 'All Data'} Overview 📅")
+
+cube = cubes[selected_year]
+
+filters = render_filter_panel(filter_indexes.get(selected_year))
+if filters:
+    with profile_phase("filter_panel", "build"):
+        cube = filter_indexes[selected_year].filtered_cube(filters)
 
 title_col, selector_col = st.columns([3, 2], vertical_alignment="center")
 
@@ -60,21 +119,63 @@ with selector_col:
         label_visibility="collapsed",
     )
 
+set_render_context(year=selected_year, condition=selected_condition, filters=filters)
+
 st.markdown(
-    f"This view shows a national overview of {CONDITION_LABELS[selected_condition]} in the United States for 2022. **Select a state** to view state-level trends and visualizations."
+    f"This view shows a national overview of {CONDITION_LABELS[selected_condition]} in the United States{f' for {selected_year}' if selected_year else ''}. **Select one or more states** (click, shift-click, box or lasso) or pick a region to view its trends and visualizations."
 )
 
-render_us_map(df, selected_condition)
 
-selected_state = st.session_state.selected_state
+@st.fragment
+def render_state_views(cube: AggregateCube, selected_condition: str):
+    # A map click reruns only this fragment: the map re-emits from the view
+    # cache and the detail sections follow the new state.
+    start_fragment_run(year=cube.year, condition=selected_condition)
+
+    if cube.counts("state", selected_condition, None)[0] == 0:
+        st.info(
+            f"No {CONDITION_LABELS[selected_condition]} cases among the respondents matching the filters."
+        )
+        return
+
+    render_us_map(cube, selected_condition)
+
+    selected_region = st.selectbox(
+        "Region:",
+        options=[None, *CENSUS_REGIONS.keys()],
+        format_func=lambda x: "States selected on the map" if x is None else x,
+        key="selected_region",
+    )
+
+    if selected_region is None:
+        selected_state = st.session_state.selected_state
+    else:
+        selected_state = tuple(sorted(CENSUS_REGIONS[selected_region]))
+
+    set_render_context(state=selected_state)
+
+    st.markdown(f"#### Overview by Variables - {describe_selection(selected_state)}")
+    st.markdown(f"View key health metrics for {describe_selection(selected_state)}.")
+
+    if cube.counts("state", selected_condition, selected_state)[0] == 0:
+        st.info(
+            f"No {CONDITION_LABELS[selected_condition]} cases reported in {describe_selection(selected_state)} for this selection."
+        )
+        return
+
+    selected_group = st.segmented_control(
+        "Sections:",
+        options=list(DETAIL_SECTION_GROUPS.keys()),
+        default="Demographics",
+        key="detail_section_group",
+        label_visibility="collapsed",
+    )
+
+    for render_section in DETAIL_SECTION_GROUPS[selected_group or "Demographics"]:
+        render_section(cube, selected_condition, selected_state)
+
 
-st.markdown(f"#### Overview by Variables - {selected_state or 'All U.S.'}")
-st.markdown(f"View key health metrics for {selected_state or 'All U.S'}.")
+render_state_views(cube, selected_condition)
 
-render_risk_percentage_by_age(df, selected_condition, selected_state)
-render_case_proportion_by_sex_age(df, selected_condition, selected_state)
-render_cases_by_sleep_hours(df, selected_condition, selected_state)
-render_smoking_alcohol_interaction(df, selected_condition, selected_state)
-render_case_ratio_smoking_vs_vape(df, selected_condition, selected_state)
-render_case_percentage_by_general_health(df, selected_condition, selected_state)
-render_cases_by_physical_activities(df, selected_condition, selected_state)
+report_first_render(warm_up=warm_up_status())
+render_profile_sidebar(render_run)
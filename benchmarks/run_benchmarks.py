@@ -0,0 +1,191 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import write_csv
+from components.condition_comparison import COMPARISON_VIEWS
+from components.measure_distribution import DEFAULT_BIN_WIDTHS, MEASURE_VIEWS
+from components.risk_factor_ranking import RISK_MEASURES
+from constants.conditions import CONDITION_LABELS
+from services.aggregates import build_cube
+from services.data_loader import read_data
+from services.view_cache import view_cache
+
+COMPONENTS = [
+    "us_map",
+    "risk_percentage_by_age",
+    "case_proportion_by_sex_age",
+    "cases_by_sleep_hours",
+    "smoking_alcohol_interaction",
+    "case_ratio_smoking_vs_vape",
+    "case_percentage_by_general_health",
+    "cases_by_physical_activities",
+    "measure_distribution",
+    "risk_factor_ranking",
+    "condition_comparison",
+]
+
+# Widget choices passed between the condition and the state, one benchmark
+# per choice; the distribution uses each view's default bin width.
+COMPONENT_OPTIONS = {
+    "measure_distribution": [
+        (view, DEFAULT_BIN_WIDTHS[view]) for view in MEASURE_VIEWS
+    ],
+    "risk_factor_ranking": [(measure,) for measure in RISK_MEASURES],
+    "condition_comparison": [(view,) for view in COMPARISON_VIEWS],
+}
+
+
+def run(rows: int, state_sample: int, repeat: int, workdir: str, seed: int):
+    csv_path = os.path.join(workdir, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(csv_path):
+        write_csv(rows, csv_path, seed=seed)
+
+    results = []
+
+    df, result = _measure(lambda: read_data(csv_path), repeat=1)
+    results.append(
+        {
+            "rows": rows,
+            "benchmark": "read_data",
+            **result,
+            "frame_bytes": int(df.memory_usage(deep=True).sum()),
+        }
+    )
+
+    cube, result = _measure(lambda: build_cube(df), repeat=repeat)
+    results.append({"rows": rows, "benchmark": "build_cube", **result})
+
+    rng = np.random.default_rng(seed)
+    states = [None, *rng.choice(cube.states, state_sample, replace=False).tolist()]
+
+    for name in COMPONENTS:
+        # Bypass the view cache so every call measures the actual preparation.
+        prepare = importlib.import_module(
+            f"components.{name}"
+        )._prepare_data_frame.__wrapped__
+
+        # The comparison takes every condition at once.
+        if name == "condition_comparison":
+            conditions = [tuple(CONDITION_LABELS)]
+        else:
+            conditions = list(CONDITION_LABELS)
+
+        for condition in conditions:
+            for options in COMPONENT_OPTIONS.get(name, [()]):
+                for state in states:
+                    if name == "us_map":
+                        if state is not None:
+                            continue
+                        args = (cube, condition)
+                    else:
+                        args = (cube, condition, *options, state)
+
+                    _, result = _measure(lambda: _uncached(prepare, args), repeat)
+
+                    results.append(
+                        {
+                            "rows": rows,
+                            "benchmark": f"prepare.{name}",
+                            "condition": condition,
+                            "options": list(options),
+                            "state": state,
+                            **result,
+                        }
+                    )
+
+    return results
+
+
+def _uncached(prepare, args: tuple):
+    # Memoized helpers the prepare step calls (the ranking's factor table)
+    # would otherwise be served from the cache after the first call.
+    view_cache.clear()
+    return prepare(*args)
+
+
+def _measure(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return value, {
+        "seconds_min": min(timings),
+        "seconds_median": float(np.median(timings)),
+        "peak_bytes": peak_bytes,
+    }
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _summary(results: list[dict]):
+    df = pd.DataFrame(results)
+    return (
+        df.groupby(["rows", "benchmark"], sort=False)
+        .agg(
+            seconds_median=("seconds_median", "median"),
+            seconds_max=("seconds_median", "max"),
+            peak_mb=("peak_bytes", lambda peak: peak.max() / 1e6),
+        )
+        .reset_index()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time and profile data loading and every prepare function."
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[250_000], help="dataset sizes to run"
+    )
+    parser.add_argument("--states", type=int, default=5, help="states to sample")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=tempfile.gettempdir())
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        results.extend(run(rows, args.states, args.repeat, args.workdir, args.seed))
+
+    with open(args.output, "w") as output:
+        json.dump({"metadata": _metadata(), "results": results}, output, indent=2)
+
+    print(_summary(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from constants.categories import (
+    AGE_CATEGORIES,
+    COVID_POSITIVE_CATEGORIES,
+    E_CIGARETTE_USAGE_CATEGORIES,
+    GENERAL_HEALTH_CATEGORIES,
+    LAST_CHECKUP_TIME_CATEGORIES,
+    RACE_ETHNICITY_CATEGORIES,
+    REMOVED_TEETH_CATEGORIES,
+    SEX_CATEGORIES,
+    SMOKER_STATUS_CATEGORIES,
+    TETANUS_CATEGORIES,
+    YES_NO_CATEGORIES,
+)
+from constants.us_states import STATE_NAMES
+
+# Column order and vocabularies follow heart_2022_no_nans.csv. Condition
+# prevalences are rough national figures so filters select realistic shares.
+CONDITION_PREVALENCE = {
+    "HadHeartAttack": 0.055,
+    "HadAngina": 0.06,
+    "HadStroke": 0.04,
+    "HadAsthma": 0.15,
+    "HadSkinCancer": 0.08,
+    "HadCOPD": 0.08,
+    "HadDepressiveDisorder": 0.2,
+    "HadKidneyDisease": 0.045,
+    "HadArthritis": 0.35,
+}
+
+DIABETES_CATEGORIES = [
+    "No",
+    "Yes",
+    "No, pre-diabetes or borderline diabetes",
+    "Yes, but only during pregnancy (female)",
+]
+
+DIABETES_PROBABILITIES = [0.83, 0.13, 0.03, 0.01]
+
+YES_NO_COLUMNS_AFTER_DIABETES = [
+    "DeafOrHardOfHearing",
+    "BlindOrVisionDifficulty",
+    "DifficultyConcentrating",
+    "DifficultyWalking",
+    "DifficultyDressingBathing",
+    "DifficultyErrands",
+]
+
+YES_NO_COLUMNS_AFTER_BMI = [
+    "AlcoholDrinkers",
+    "HIVTesting",
+    "FluVaxLast12",
+    "PneumoVaxEver",
+]
+
+
+def generate_dataset(rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+
+    def choice(categories, probabilities=None):
+        return pd.Categorical.from_codes(
+            rng.choice(len(categories), rows, p=probabilities), categories=categories
+        )
+
+    def yes_no(probability=0.5):
+        return choice(YES_NO_CATEGORIES, [1 - probability, probability])
+
+    height = rng.normal(1.70, 0.10, rows).clip(0.91, 2.41).round(2)
+    weight = rng.normal(83, 20, rows).clip(22.68, 292.57).round(2)
+
+    data = {
+        "State": choice(STATE_NAMES),
+        "Sex": choice(SEX_CATEGORIES),
+        "GeneralHealth": choice(
+            GENERAL_HEALTH_CATEGORIES, [0.04, 0.12, 0.31, 0.35, 0.18]
+        ),
+        "PhysicalHealthDays": rng.integers(0, 31, rows).astype(float),
+        "MentalHealthDays": rng.integers(0, 31, rows).astype(float),
+        "LastCheckupTime": choice(LAST_CHECKUP_TIME_CATEGORIES),
+        "PhysicalActivities": yes_no(0.78),
+        "SleepHours": rng.integers(1, 25, rows).astype(float),
+        "RemovedTeeth": choice(REMOVED_TEETH_CATEGORIES),
+    }
+    data.update(
+        {
+            condition: yes_no(prevalence)
+            for condition, prevalence in CONDITION_PREVALENCE.items()
+        }
+    )
+    data["HadDiabetes"] = choice(DIABETES_CATEGORIES, DIABETES_PROBABILITIES)
+    data.update({column: yes_no(0.1) for column in YES_NO_COLUMNS_AFTER_DIABETES})
+    data.update(
+        {
+            "SmokerStatus": choice(SMOKER_STATUS_CATEGORIES, [0.6, 0.27, 0.04, 0.09]),
+            "ECigaretteUsage": choice(
+                E_CIGARETTE_USAGE_CATEGORIES, [0.77, 0.18, 0.02, 0.03]
+            ),
+            "ChestScan": yes_no(0.43),
+            "RaceEthnicityCategory": choice(RACE_ETHNICITY_CATEGORIES),
+            "AgeCategory": choice(AGE_CATEGORIES),
+            "HeightInMeters": height,
+            "WeightInKilograms": weight,
+            "BMI": (weight / height**2).round(2),
+        }
+    )
+    data.update({column: yes_no() for column in YES_NO_COLUMNS_AFTER_BMI})
+    data.update(
+        {
+            "TetanusLast10Tdap": choice(TETANUS_CATEGORIES),
+            "HighRiskLastYear": yes_no(0.04),
+            "CovidPos": choice(COVID_POSITIVE_CATEGORIES, [0.7, 0.27, 0.03]),
+        }
+    )
+
+    return pd.DataFrame(data)
+
+
+def write_csv(rows: int, path: str, seed: int = 0, chunk_rows: int = 1_000_000):
+    written = 0
+    chunk_index = 0
+
+    while written < rows:
+        chunk = generate_dataset(min(chunk_rows, rows - written), seed + chunk_index)
+        chunk.to_csv(
+            path, mode="w" if written == 0 else "a", header=written == 0, index=False
+        )
+        written += len(chunk)
+        chunk_index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic CSV with the heart_2022_no_nans.csv schema."
+    )
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output_path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_csv(args.rows, args.output_path, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
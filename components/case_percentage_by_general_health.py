@@ -1,59 +1,76 @@
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
+from constants.categories import GENERAL_HEALTH_CATEGORIES
 from constants.conditions import CONDITION_LABELS
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import share_interval
+from services.view_cache import memoize_view
 
-_general_health_order = ["Poor", "Fair", "Good", "Very Good", "Excellent"]
+SECTION = "case_percentage_by_general_health"
 
 
 def render_case_percentage_by_general_health(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
     st.markdown(
         f"##### {CONDITION_LABELS[selected_condition]} Case Percentage by General Health"
     )
 
-    df_prepared = _prepare_data_frame(df, selected_condition, selected_state)
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+        insight_text = _insight_text(cube, selected_condition, selected_state)
 
-    cols = st.columns([3, 2])
+    with profile_phase(SECTION, "build"):
+        fig = _plot_case_percentage_by_general_health(df_prepared)
 
-    with cols[0].container(border=True):
-        _plot_case_percentage_by_general_health(df_prepared)
+    with profile_phase(SECTION, "emit"):
+        cols = st.columns([3, 2])
 
-    with cols[1]:
-        df_sorted = df_prepared.sort_values(
-            by="Case Percentage (%)", ascending=False
-        ).head(2)
+        with cols[0].container(border=True):
+            st.plotly_chart(fig, height=350)
 
-        st.markdown(
-            f"This chart shows **the percentage distribution of {CONDITION_LABELS[selected_condition]} cases across general health categories**, where the categories themselves represent overall health status ranging from Poor to Excellent. <mark>The largest share of cases is observed in the {df_sorted.iloc[0]['General Health']} category at approximately {df_sorted.iloc[0]['Case Percentage (%)']}%, followed by {df_sorted.iloc[1]['General Health']} with {df_sorted.iloc[1]['Case Percentage (%)']}%</mark>, while other health categories account for smaller proportions of cases.",
-            unsafe_allow_html=True,
-        )
+        with cols[1]:
+            st.markdown(insight_text, unsafe_allow_html=True)
 
 
-def _prepare_data_frame(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
-    df_cases = df[df[selected_condition] == "Yes"]
+    df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
 
-    if selected_state is not None:
-        df_cases = df_cases[df_cases["State"] == selected_state]
+    df_sorted = df_prepared.sort_values(by="Case Percentage (%)", ascending=False).head(
+        2
+    )
 
-    df_counts = df_cases.groupby("GeneralHealth", as_index=False)[
-        selected_condition
-    ].count()
+    return f"This chart shows **the percentage distribution of {CONDITION_LABELS[selected_condition]} cases across general health categories**, where the categories themselves represent overall health status ranging from Poor to Excellent. <mark>The largest share of cases is observed in the {df_sorted.iloc[0]['General Health']} category at approximately {df_sorted.iloc[0]['Case Percentage (%)']}%, followed by {df_sorted.iloc[1]['General Health']} with {df_sorted.iloc[1]['Case Percentage (%)']}%</mark>, while other health categories account for smaller proportions of cases."
 
-    df_final = pd.DataFrame({"GeneralHealth": _general_health_order})
-    df_final = df_final.merge(
-        df_counts, left_on="GeneralHealth", right_on="GeneralHealth", how="left"
-    ).fillna(0)
+
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_final = cube.frame("general_health", selected_condition, selected_state)
+    df_final = df_final[["GeneralHealth", "Number of Cases"]].rename(
+        columns={"Number of Cases": selected_condition}
+    )
 
     total_cases = df_final[selected_condition].sum()
 
     df_final["Case Percentage (%)"] = (
         df_final[selected_condition] / total_cases * 100
     ).round(2)
+    df_final["Case Percentage Low (%)"], df_final["Case Percentage High (%)"] = (
+        share_interval(df_final[selected_condition])
+    )
 
     df_final.rename(columns={"GeneralHealth": "General Health"}, inplace=True)
 
@@ -61,14 +78,21 @@ def _prepare_data_frame(
 
 
 def _plot_case_percentage_by_general_health(df: pd.DataFrame):
+    import plotly.express as px
+
     fig = px.pie(
         df,
         values="Case Percentage (%)",
         names="General Health",
-        category_orders={"General Health": _general_health_order},
+        category_orders={"General Health": GENERAL_HEALTH_CATEGORIES},
         title="",
         hole=0.4,
+        custom_data=["Case Percentage Low (%)", "Case Percentage High (%)"],
+    )
+    fig.update_traces(
+        textposition="inside",
+        textinfo="percent",
+        hovertemplate="%{label}: %{value}% (95% CI %{customdata[0][0]}-%{customdata[0][1]}%)<extra></extra>",
     )
-    fig.update_traces(textposition="inside", textinfo="percent")
 
-    st.plotly_chart(fig, height=350)
+    return fig
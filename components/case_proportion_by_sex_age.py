@@ -1,25 +1,60 @@
-import altair as alt
 import pandas as pd
 import streamlit as st
 
+from constants.categories import AGE_GROUP_SIMPLE_CATEGORIES
 from constants.conditions import CONDITION_LABELS
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.view_cache import memoize_view
+
+SECTION = "case_proportion_by_sex_age"
 
 
 def render_case_proportion_by_sex_age(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
     st.markdown(
         f"##### {CONDITION_LABELS[selected_condition]} Case Proportion by Sex Across Age Categories"
     )
 
-    df_prepared = _prepare_data_frame(df, selected_condition, selected_state)
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+        insight_text = _insight_text(cube, selected_condition, selected_state)
+
+    with profile_phase(SECTION, "build"):
+        chart = _plot_case_proportion_by_sex_age(df_prepared, selected_condition)
+
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            st.altair_chart(chart)
+
+        st.markdown(insight_text, unsafe_allow_html=True)
 
-    with st.container(border=True):
-        _plot_case_proportion_by_sex_age(df_prepared, selected_condition)
 
-    pivot = df_prepared.pivot(
-        index="Age Category", columns="Sex", values="Number of Cases"
-    ).reset_index()
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+
+    # A filtered cube can leave one sex without cases, in some age groups or
+    # in all of them.
+    pivot = (
+        df_prepared.pivot_table(
+            index="Age Category",
+            columns="Sex",
+            values="Number of Cases",
+            aggfunc="sum",
+            fill_value=0,
+            observed=True,
+        )
+        .reindex(columns=["Male", "Female"], fill_value=0)
+        .reset_index()
+    )
     pivot["Total"] = pivot["Male"] + pivot["Female"]
     pivot["Male %"] = pivot["Male"] / pivot["Total"] * 100
     pivot["Female %"] = pivot["Female"] / pivot["Total"] * 100
@@ -32,35 +67,25 @@ def render_case_proportion_by_sex_age(
 
     most_balanced = pivot.loc[pivot["Imbalance"].idxmin()]
 
-    st.markdown(
-        f"This chart shows the **proportion of {CONDITION_LABELS[selected_condition]} cases by sex across different age categories**, highlighting how male and female case shares vary as age increases. <mark>In {most_imbalanced['Age Category']}, {dominant_sex} accounts for a larger proportion ({most_imbalanced[f'{dominant_sex} %']:.2f}%), while {most_balanced['Age Category']} shows a more even distribution between sexes</mark>, indicating that sex-related differences in {CONDITION_LABELS[selected_condition]} cases may change across age groups.",
-        unsafe_allow_html=True,
-    )
+    return f"This chart shows the **proportion of {CONDITION_LABELS[selected_condition]} cases by sex across different age categories**, highlighting how male and female case shares vary as age increases. <mark>In {most_imbalanced['Age Category']}, {dominant_sex} accounts for a larger proportion ({most_imbalanced[f'{dominant_sex} %']:.2f}%), while {most_balanced['Age Category']} shows a more even distribution between sexes</mark>, indicating that sex-related differences in {CONDITION_LABELS[selected_condition]} cases may change across age groups."
 
 
+@memoize_view(SECTION)
 def _prepare_data_frame(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
-    df_cases = df[df[selected_condition] == "Yes"]
-
-    if selected_state is not None:
-        df_cases = df_cases[df_cases["State"] == selected_state]
-
-    df_cases["AgeCategory"] = df_cases["AgeCategory"].apply(_simplify_age)
-    df_cases.rename(columns={"AgeCategory": "Age Category"}, inplace=True)
-    df_cases.rename(columns={selected_condition: "Number of Cases"}, inplace=True)
-
-    df_counts = (
-        df_cases.groupby(["Age Category", "Sex"], as_index=False)["Number of Cases"]
-        .count()
-        .reset_index()
+    df_counts = cube.frame("age_sex", selected_condition, selected_state)
+    df_counts = df_counts[["AgeGroupSimple", "Sex", "Number of Cases"]].rename(
+        columns={"AgeGroupSimple": "Age Category"}
     )
 
-    return df_counts
+    return df_counts[df_counts["Number of Cases"] > 0]
 
 
 def _plot_case_proportion_by_sex_age(df: pd.DataFrame, selected_condition: str):
-    simple_age_order = ["<45 Years", "45-64 Years", "65-79 Years", ">=80 Years"]
+    import altair as alt
 
     color_scale = alt.Scale(domain=["Male", "Female"], range=["#1f77b4", "#ff7f0e"])
 
@@ -68,7 +93,9 @@ def _plot_case_proportion_by_sex_age(df: pd.DataFrame, selected_condition: str):
         alt.Chart(df)
         .mark_bar()
         .encode(
-            y=alt.Y("Age Category:N", sort=simple_age_order, title="Age Category"),
+            y=alt.Y(
+                "Age Category:N", sort=AGE_GROUP_SIMPLE_CATEGORIES, title="Age Category"
+            ),
             x=alt.X(
                 "Number of Cases:Q",
                 stack="normalize",
@@ -91,27 +118,4 @@ def _plot_case_proportion_by_sex_age(df: pd.DataFrame, selected_condition: str):
         .interactive()
     )
 
-    st.altair_chart(chart)
-
-
-def _simplify_age(age_category):
-    if age_category in [
-        "Age 18 to 24",
-        "Age 25 to 29",
-        "Age 30 to 34",
-        "Age 35 to 39",
-        "Age 40 to 44",
-    ]:
-        return "<45 Years"
-    elif age_category in [
-        "Age 45 to 49",
-        "Age 50 to 54",
-        "Age 55 to 59",
-        "Age 60 to 64",
-    ]:
-        return "45-64 Years"
-    elif age_category in ["Age 65 to 69", "Age 70 to 74", "Age 75 to 79"]:
-        return "65-79 Years"
-    elif age_category == "Age 80 or older":
-        return ">=80 Years"
-    return age_category
+    return chart
@@ -1,21 +1,46 @@
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
+from constants.categories import SMOKER_STATUS_SIMPLE_CATEGORIES
 from constants.conditions import CONDITION_LABELS
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import ratio_interval
+from services.view_cache import memoize_view
+
+SECTION = "case_ratio_smoking_vs_vape"
 
 
 def render_case_ratio_smoking_vs_vape(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
     st.markdown(
         f"##### {CONDITION_LABELS[selected_condition]} Case Ratio: Traditional Smoking vs Vape/E-Cig Use"
     )
 
-    df_prepared = _prepare_data_frame(df, selected_condition, selected_state)
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+        insight_text = _insight_text(cube, selected_condition, selected_state)
+
+    with profile_phase(SECTION, "build"):
+        fig = _plot_case_ratio_smoking_vs_vape(df_prepared, selected_condition)
+
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            st.plotly_chart(fig, height=350)
 
-    with st.container(border=True):
-        _plot_case_ratio_smoking_vs_vape(df_prepared, selected_condition)
+        st.markdown(insight_text, unsafe_allow_html=True)
+
+
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
 
     smoker_labels = {
         "Never smoked": "never smokers",
@@ -32,53 +57,37 @@ def render_case_ratio_smoking_vs_vape(
 
     highest = df_prepared.loc[df_prepared["Case Ratio (%)"].idxmax()]
 
-    st.markdown(
-        f"This chart shows the **{CONDITION_LABELS[selected_condition]} case ratio across traditional smoking statuses, further grouped by vape or e-cigarette usage**. Within each smoking category, case ratios vary across vape usage groups, with <mark>the highest observed value occurring among {smoker_labels[highest['Traditional Smoker Status']]} and {e_cig_labels[highest['Vape/E-Cig Usage']]} at approximately {highest['Case Ratio (%)']}%</mark>. Overall, the chart highlights differences in {CONDITION_LABELS[selected_condition]} case ratios across combinations of smoking and vape use behaviors.",
-        unsafe_allow_html=True,
-    )
+    return f"This chart shows the **{CONDITION_LABELS[selected_condition]} case ratio across traditional smoking statuses, further grouped by vape or e-cigarette usage**. Within each smoking category, case ratios vary across vape usage groups, with <mark>the highest observed value occurring among {smoker_labels[highest['Traditional Smoker Status']]} and {e_cig_labels[highest['Vape/E-Cig Usage']]} at approximately {highest['Case Ratio (%)']}%</mark>. Overall, the chart highlights differences in {CONDITION_LABELS[selected_condition]} case ratios across combinations of smoking and vape use behaviors."
 
 
+@memoize_view(SECTION)
 def _prepare_data_frame(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
-    df_copy = df.copy()
-
-    if selected_state is not None:
-        df_copy = df_copy[df_copy["State"] == selected_state]
-
-    df_copy["SmokerStatus"] = df_copy["SmokerStatus"].apply(_simplify_smoker_status)
-
-    df_copy.rename(columns={selected_condition: "Total Population"}, inplace=True)
-    df_copy.rename(columns={"SmokerStatus": "Traditional Smoker Status"}, inplace=True)
-    df_copy.rename(columns={"ECigaretteUsage": "Vape/E-Cig Usage"}, inplace=True)
-
-    df_pop = df_copy.groupby(
-        ["Traditional Smoker Status", "Vape/E-Cig Usage"], as_index=False
-    )["Total Population"].count()
-
-    df_copy.rename(columns={"Total Population": "Number of Cases"}, inplace=True)
-
-    df_cases = df_copy[df_copy["Number of Cases"] == "Yes"]
-    df_counts = df_cases.groupby(
-        ["Traditional Smoker Status", "Vape/E-Cig Usage"], as_index=False
-    )["Number of Cases"].count()
+    df_risk = cube.frame("smoker_e_cig", selected_condition, selected_state)
+    df_risk.rename(
+        columns={
+            "SmokerStatusSimple": "Traditional Smoker Status",
+            "ECigaretteUsage": "Vape/E-Cig Usage",
+        },
+        inplace=True,
+    )
 
-    df_risk = df_pop.merge(
-        df_counts, on=["Traditional Smoker Status", "Vape/E-Cig Usage"], how="left"
-    ).fillna(0)
+    df_risk = df_risk[df_risk["Total Population"] > 0].reset_index(drop=True)
     df_risk["Case Ratio (%)"] = (
         df_risk["Number of Cases"] / df_risk["Total Population"] * 100
     ).round(2)
+    df_risk["Case Ratio Low (%)"], df_risk["Case Ratio High (%)"] = ratio_interval(
+        df_risk["Number of Cases"], df_risk["Total Population"]
+    )
 
     return df_risk
 
 
 def _plot_case_ratio_smoking_vs_vape(df: pd.DataFrame, selected_condition: str):
-    smoker_order = [
-        "Never smoked",
-        "Former smoker",
-        "Current smoker",
-    ]
+    import plotly.express as px
 
     fig = px.bar(
         df,
@@ -86,7 +95,10 @@ def _plot_case_ratio_smoking_vs_vape(df: pd.DataFrame, selected_condition: str):
         y="Case Ratio (%)",
         color="Vape/E-Cig Usage",
         barmode="group",
-        category_orders={"Traditional Smoker Status": smoker_order},
+        error_y=df["Case Ratio High (%)"] - df["Case Ratio (%)"],
+        error_y_minus=df["Case Ratio (%)"] - df["Case Ratio Low (%)"],
+        hover_data=["Case Ratio Low (%)", "Case Ratio High (%)"],
+        category_orders={"Traditional Smoker Status": SMOKER_STATUS_SIMPLE_CATEGORIES},
         title="",
     )
 
@@ -97,14 +109,4 @@ def _plot_case_ratio_smoking_vs_vape(df: pd.DataFrame, selected_condition: str):
         legend_title="Vape/E-Cig Usage",
     )
 
-    st.plotly_chart(fig, height=350)
-
-
-def _simplify_smoker_status(status):
-    if "Current" in status:
-        return "Current smoker"
-    elif "Former" in status:
-        return "Former smoker"
-    elif "Never" in status:
-        return "Never smoked"
-    return status
+    return fig
@@ -1,59 +1,79 @@
-import altair as alt
 import pandas as pd
 import streamlit as st
 
 from constants.conditions import CONDITION_LABELS
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.view_cache import memoize_view
+
+SECTION = "cases_by_physical_activities"
 
 
 def render_cases_by_physical_activities(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
     st.markdown(
         f"##### {CONDITION_LABELS[selected_condition]} Case Distribution by Physical Activities"
     )
 
-    df_prepared = _prepare_data_frame(df, selected_condition, selected_state)
-
-    cols = st.columns([3, 2])
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+        insight_text = _insight_text(cube, selected_condition, selected_state)
 
-    with cols[0].container(border=True):
-        _plot_cases_by_physical_activities(df_prepared)
+    with profile_phase(SECTION, "build"):
+        chart = _plot_cases_by_physical_activities(df_prepared)
 
-    with cols[1]:
-        physical_activities_labels = {
-            "Yes": "physically active",
-            "No": "physically inactive",
-        }
+    with profile_phase(SECTION, "emit"):
+        cols = st.columns([3, 2])
 
-        df_sorted = df_prepared.sort_values(by="Number of Cases", ascending=False)
+        with cols[0].container(border=True):
+            st.altair_chart(chart)
 
-        st.markdown(
-            f"This chart shows the **distribution of {CONDITION_LABELS[selected_condition]} cases by physical activity status**, comparing individuals who are physically active with those who are not. <mark>A higher number of cases is observed among {physical_activities_labels[df_sorted.iloc[0]['Physically Active']]} individuals ({df_sorted.iloc[0]['Number of Cases']}) compared with {physical_activities_labels[df_sorted.iloc[1]['Physically Active']]} individuals ({df_sorted.iloc[1]['Number of Cases']})</mark>, highlighting a difference in case counts between the two activity groups.",
-            unsafe_allow_html=True,
-        )
+        with cols[1]:
+            st.markdown(insight_text, unsafe_allow_html=True)
 
 
-def _prepare_data_frame(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
-    df_cases = df[df[selected_condition] == "Yes"]
+    df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+
+    physical_activities_labels = {
+        "Yes": "physically active",
+        "No": "physically inactive",
+    }
 
-    if selected_state is not None:
-        df_cases = df_cases[df_cases["State"] == selected_state]
+    df_sorted = df_prepared.sort_values(by="Number of Cases", ascending=False)
 
-    df_cases.rename(columns={"PhysicalActivities": "Physically Active"}, inplace=True)
-    df_cases.rename(columns={selected_condition: "Number of Cases"}, inplace=True)
+    # A filtered cube can leave only one activity group with cases.
+    if len(df_sorted) < 2:
+        return f"This chart shows the **distribution of {CONDITION_LABELS[selected_condition]} cases by physical activity status**. <mark>All {df_sorted.iloc[0]['Number of Cases']} cases in this selection are among {physical_activities_labels[df_sorted.iloc[0]['Physically Active']]} individuals</mark>."
 
-    df_counts = (
-        df_cases.groupby("Physically Active", as_index=False)["Number of Cases"]
-        .count()
-        .reset_index()
+    return f"This chart shows the **distribution of {CONDITION_LABELS[selected_condition]} cases by physical activity status**, comparing individuals who are physically active with those who are not. <mark>A higher number of cases is observed among {physical_activities_labels[df_sorted.iloc[0]['Physically Active']]} individuals ({df_sorted.iloc[0]['Number of Cases']}) compared with {physical_activities_labels[df_sorted.iloc[1]['Physically Active']]} individuals ({df_sorted.iloc[1]['Number of Cases']})</mark>, highlighting a difference in case counts between the two activity groups."
+
+
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_counts = cube.frame("physical_activities", selected_condition, selected_state)
+    df_counts = df_counts[["PhysicalActivities", "Number of Cases"]].rename(
+        columns={"PhysicalActivities": "Physically Active"}
     )
 
-    return df_counts
+    return df_counts[df_counts["Number of Cases"] > 0]
 
 
 def _plot_cases_by_physical_activities(df: pd.DataFrame):
+    import altair as alt
+
     chart = (
         alt.Chart(df)
         .mark_bar()
@@ -72,4 +92,4 @@ def _plot_cases_by_physical_activities(df: pd.DataFrame):
         .interactive()
     )
 
-    st.altair_chart(chart)
+    return chart
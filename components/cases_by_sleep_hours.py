@@ -1,51 +1,67 @@
-import altair as alt
 import pandas as pd
 import streamlit as st
 
 from constants.conditions import CONDITION_LABELS
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.view_cache import memoize_view
+
+SECTION = "cases_by_sleep_hours"
 
 
 def render_cases_by_sleep_hours(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
     st.markdown(
         f"##### {CONDITION_LABELS[selected_condition]} Case Distribution by Sleep Hours"
     )
 
-    df_prepared = _prepare_data_frame(df, selected_condition, selected_state)
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+        insight_text = _insight_text(cube, selected_condition, selected_state)
 
-    with st.container(border=True):
-        _plot_cases_by_sleep_hours(df_prepared)
+    with profile_phase(SECTION, "build"):
+        chart = _plot_cases_by_sleep_hours(df_prepared)
 
-    highest = df_prepared.loc[df_prepared["Number of Cases"].idxmax()]
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            st.altair_chart(chart)
 
-    st.markdown(
-        f"This chart shows the **distribution of {CONDITION_LABELS[selected_condition]} cases across different sleep durations**, illustrating how the number of reported cases varies by sleep hours. <mark>The highest recorded count occurs at {highest['Sleep Hours']:0.0f} hours with {highest['Number of Cases']:0.0f} cases</mark>, while other sleep durations show differing case levels across the range.",
-        unsafe_allow_html=True,
-    )
+        st.markdown(insight_text, unsafe_allow_html=True)
 
 
-def _prepare_data_frame(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
-    df_cases = df[df[selected_condition] == "Yes"]
+    df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
 
-    if selected_state is not None:
-        df_cases = df_cases[df_cases["State"] == selected_state]
+    highest = df_prepared.loc[df_prepared["Number of Cases"].idxmax()]
+
+    return f"This chart shows the **distribution of {CONDITION_LABELS[selected_condition]} cases across different sleep durations**, illustrating how the number of reported cases varies by sleep hours. <mark>The highest recorded count occurs at {highest['Sleep Hours']:0.0f} hours with {highest['Number of Cases']:0.0f} cases</mark>, while other sleep durations show differing case levels across the range."
 
-    df_cases.rename(columns={"SleepHours": "Sleep Hours"}, inplace=True)
-    df_cases.rename(columns={selected_condition: "Number of Cases"}, inplace=True)
 
-    df_counts = (
-        df_cases.groupby("Sleep Hours", as_index=False)["Number of Cases"]
-        .count()
-        .reset_index()
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_counts = cube.frame("sleep_hours", selected_condition, selected_state)
+    df_counts = df_counts[["SleepHours", "Number of Cases"]].rename(
+        columns={"SleepHours": "Sleep Hours"}
     )
 
-    return df_counts
+    return df_counts[df_counts["Number of Cases"] > 0]
 
 
 def _plot_cases_by_sleep_hours(df: pd.DataFrame):
+    import altair as alt
+
     chart = (
         alt.Chart(df)
         .mark_line(point=True)
@@ -63,4 +79,4 @@ def _plot_cases_by_sleep_hours(df: pd.DataFrame):
         .interactive()
     )
 
-    st.altair_chart(chart)
+    return chart
@@ -0,0 +1,183 @@
+import pandas as pd
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from services.aggregates import VIEW_DIMENSIONS, AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import ratio_interval
+from services.view_cache import memoize_view
+
+SECTION = "condition_comparison"
+
+COMPARISON_VIEWS = {
+    "age": "Age",
+    "age_sex": "Age & Sex",
+    "sleep_hours": "Sleep Hours",
+    "smoker_alcohol": "Smoking & Alcohol",
+    "smoker_e_cig": "Smoking & Vape/E-Cig Use",
+    "general_health": "General Health",
+    "physical_activities": "Physical Activities",
+}
+
+DIMENSION_TITLES = {
+    "AgeCategory": "Age Category",
+    "AgeGroupSimple": "Age Category",
+    "Sex": "Sex",
+    "SleepHours": "Sleep Hours",
+    "SmokerStatusSimple": "Smoker Status",
+    "AlcoholDrinkers": "Alcohol Drinkers",
+    "ECigaretteUsage": "E-Cigarette Usage",
+    "GeneralHealth": "General Health",
+    "PhysicalActivities": "Physical Activities",
+}
+
+
+def render_condition_comparison(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    st.markdown("##### Condition Comparison")
+
+    cols = st.columns([3, 2])
+
+    with cols[0]:
+        selected_conditions = st.multiselect(
+            "Conditions:",
+            options=list(CONDITION_LABELS.keys()),
+            default=list(CONDITION_LABELS.keys()),
+            format_func=lambda x: CONDITION_LABELS[x],
+            key="comparison_conditions",
+        )
+    with cols[1]:
+        selected_view = st.selectbox(
+            "Compare by:",
+            options=list(COMPARISON_VIEWS.keys()),
+            format_func=lambda x: COMPARISON_VIEWS[x],
+            key="comparison_view",
+        )
+
+    if not selected_conditions:
+        st.info("Select at least one condition to compare.")
+        return
+
+    # Keep the option order so the memo key doesn't depend on click order.
+    selected_conditions = tuple(
+        condition for condition in CONDITION_LABELS if condition in selected_conditions
+    )
+
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(
+            cube, selected_conditions, selected_view, selected_state
+        )
+        insight_text = _insight_text(
+            cube, selected_conditions, selected_view, selected_state
+        )
+
+    with profile_phase(SECTION, "build"):
+        chart = _plot_condition_comparison(
+            df_prepared, cube.labels[selected_view], selected_view
+        )
+
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            st.altair_chart(chart)
+
+        st.markdown(insight_text, unsafe_allow_html=True)
+
+
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_conditions: tuple[str, ...],
+    selected_view: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_prepared = _prepare_data_frame(
+        cube, selected_conditions, selected_view, selected_state
+    )
+
+    if df_prepared.empty:
+        return "No respondents match this selection."
+
+    highest = df_prepared.loc[df_prepared["Prevalence (%)"].idxmax()]
+    group = ", ".join(
+        str(highest[DIMENSION_TITLES[dimension]])
+        for dimension in VIEW_DIMENSIONS[selected_view]
+    )
+
+    return f"This chart compares the **prevalence of {len(selected_conditions)} conditions by {COMPARISON_VIEWS[selected_view].lower()}**, each panel showing the share of respondents in every group who reported the condition. <mark>The highest prevalence is {highest['Prevalence (%)']:0.2f}% for {highest['Condition']} in {group}</mark>."
+
+
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_conditions: tuple[str, ...],
+    selected_view: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_counts = cube.conditions_frame(
+        selected_view, list(selected_conditions), selected_state
+    )
+    df_counts = df_counts[df_counts["Total Population"] > 0].reset_index(drop=True)
+
+    df_counts["Prevalence (%)"] = (
+        df_counts["Number of Cases"] / df_counts["Total Population"] * 100
+    ).round(2)
+    df_counts["Prevalence Low (%)"], df_counts["Prevalence High (%)"] = ratio_interval(
+        df_counts["Number of Cases"], df_counts["Total Population"]
+    )
+    df_counts["Condition"] = df_counts["Condition"].map(CONDITION_LABELS)
+
+    return df_counts.rename(columns=DIMENSION_TITLES)
+
+
+def _plot_condition_comparison(
+    df: pd.DataFrame, labels: list[list], selected_view: str
+):
+    import altair as alt
+
+    dimensions = [DIMENSION_TITLES[name] for name in VIEW_DIMENSIONS[selected_view]]
+
+    encoding = {
+        "x": alt.X(f"{dimensions[0]}:O", sort=labels[0], title=None),
+        "y": alt.Y("Prevalence (%):Q", title="Prevalence (%)"),
+        "tooltip": [
+            *dimensions,
+            alt.Tooltip("Prevalence (%):Q", format=".2f"),
+            alt.Tooltip("Prevalence Low (%):Q", format=".2f"),
+            alt.Tooltip("Prevalence High (%):Q", format=".2f"),
+            "Number of Cases",
+            "Total Population",
+        ],
+    }
+    if len(dimensions) > 1:
+        encoding["color"] = alt.Color(f"{dimensions[1]}:N", sort=labels[1])
+        encoding["xOffset"] = alt.XOffset(f"{dimensions[1]}:N", sort=labels[1])
+
+    error_bars = (
+        alt.Chart()
+        .mark_errorbar()
+        .encode(
+            x=encoding["x"],
+            y=alt.Y("Prevalence Low (%):Q", title="Prevalence (%)"),
+            y2="Prevalence High (%):Q",
+            **({"xOffset": encoding["xOffset"]} if "xOffset" in encoding else {}),
+        )
+    )
+
+    chart = (
+        alt.layer(alt.Chart().mark_bar().encode(**encoding), error_bars, data=df)
+        .properties(width=360, height=160)
+        .facet(
+            facet=alt.Facet(
+                "Condition:N",
+                sort=list(CONDITION_LABELS.values()),
+                title=None,
+            ),
+            columns=2,
+        )
+        .resolve_scale(y="independent")
+    )
+
+    return chart
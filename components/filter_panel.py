@@ -0,0 +1,61 @@
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from services.filter_index import (
+    CONDITION_FILTER,
+    FILTER_COLUMNS,
+    FilterIndex,
+    normalize_filters,
+)
+from services.instrumentation import profile_phase
+
+SECTION = "filter_panel"
+
+FILTER_LABELS = {
+    "Sex": "Sex",
+    "AgeCategory": "Age",
+    "RaceEthnicityCategory": "Race / Ethnicity",
+    "GeneralHealth": "General Health",
+    "SmokerStatus": "Smoker Status",
+    "ECigaretteUsage": "E-Cigarette Usage",
+    "AlcoholDrinkers": "Alcohol Drinkers",
+    "PhysicalActivities": "Physical Activities",
+    "BMICategory": "BMI",
+    CONDITION_FILTER: "Diagnosed with (all of)",
+}
+
+
+def render_filter_panel(index: FilterIndex | None):
+    with st.sidebar:
+        st.markdown("### Filter respondents")
+
+        if index is None:
+            st.caption(
+                "Filters need the respondent CSVs (DATA_FILES) and FILTER_PANEL=1."
+            )
+            return ()
+
+        selected = {
+            column: st.multiselect(
+                FILTER_LABELS[column],
+                options=index.values[column],
+                format_func=(
+                    (lambda x: CONDITION_LABELS[x])
+                    if column == CONDITION_FILTER
+                    else str
+                ),
+                key=f"filter_{column}",
+            )
+            for column in [*FILTER_COLUMNS, CONDITION_FILTER]
+        }
+
+        with profile_phase(SECTION, "prepare"):
+            filters = normalize_filters(selected, index)
+            matching = index.count(filters)
+
+        st.caption(
+            f"{matching:,} of {index.rows:,} respondents match "
+            f"({matching / max(index.rows, 1):.1%})."
+        )
+
+    return filters
@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from services.aggregates import NUMERIC_DIMENSION_BINS, VIEW_DIMENSIONS, AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import ratio_interval
+from services.view_cache import memoize_view
+
+SECTION = "measure_distribution"
+
+MEASURE_VIEWS = {
+    "bmi": "BMI",
+    "height": "Height (m)",
+    "weight": "Weight (kg)",
+    "sleep_hours": "Sleep Hours",
+}
+
+# Every width is a whole number of the cube's bins for that measure.
+BIN_WIDTHS = {
+    "bmi": [0.5, 1, 2, 5],
+    "height": [0.01, 0.02, 0.05, 0.1],
+    "weight": [1, 2, 5, 10],
+    "sleep_hours": [1, 2, 3],
+}
+
+DEFAULT_BIN_WIDTHS = {"bmi": 1, "height": 0.05, "weight": 5, "sleep_hours": 1}
+
+# Bins with fewer respondents are left out of the highest-ratio insight.
+MIN_INSIGHT_POPULATION = 30
+
+
+def render_measure_distribution(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    st.markdown(
+        f"##### {CONDITION_LABELS[selected_condition]} Cases vs Population by Body Measures & Sleep"
+    )
+
+    cols = st.columns([3, 2])
+
+    with cols[0]:
+        selected_view = st.selectbox(
+            "Measure:",
+            options=list(MEASURE_VIEWS.keys()),
+            format_func=lambda x: MEASURE_VIEWS[x],
+            key="distribution_measure",
+        )
+    with cols[1]:
+        bin_width = st.select_slider(
+            "Bin width:",
+            options=BIN_WIDTHS[selected_view],
+            value=DEFAULT_BIN_WIDTHS[selected_view],
+            key=f"distribution_bin_width_{selected_view}",
+        )
+
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(
+            cube, selected_condition, selected_view, bin_width, selected_state
+        )
+        insight_text = _insight_text(
+            cube, selected_condition, selected_view, bin_width, selected_state
+        )
+
+    with profile_phase(SECTION, "build"):
+        chart = _plot_measure_distribution(
+            df_prepared, selected_condition, selected_view
+        )
+
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            st.altair_chart(chart)
+
+        st.markdown(insight_text, unsafe_allow_html=True)
+
+
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_view: str,
+    bin_width: float,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_prepared = _prepare_data_frame(
+        cube, selected_condition, selected_view, bin_width, selected_state
+    )
+
+    case_median = _median_bin(df_prepared, "Number of Cases")
+    population_median = _median_bin(df_prepared, "Total Population")
+
+    df_reliable = df_prepared[df_prepared["Total Population"] >= MIN_INSIGHT_POPULATION]
+    if df_reliable.empty:
+        df_reliable = df_prepared
+    highest = df_reliable.loc[df_reliable["Case Ratio (%)"].idxmax()]
+
+    measure = MEASURE_VIEWS[selected_view]
+
+    return f"This chart compares the **{measure} distribution of {CONDITION_LABELS[selected_condition]} cases with that of all respondents**, each shown as a share of its own total. <mark>The median case falls in the {case_median} bin, against {population_median} for the whole population, and the {highest['Bin']} bin has the highest case ratio ({highest['Case Ratio (%)']:.2f}%)</mark>, showing where along the {measure} range {CONDITION_LABELS[selected_condition]} is over- or under-represented."
+
+
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_view: str,
+    bin_width: float,
+    selected_state: str | tuple[str, ...] | None,
+):
+    cases, population = cube.counts(selected_view, selected_condition, selected_state)
+
+    # Wider bins are sums of runs of the cube's fine bins; no rows are read.
+    _, fine_width, _ = NUMERIC_DIMENSION_BINS[VIEW_DIMENSIONS[selected_view][0]]
+    starts = np.arange(0, len(population), round(bin_width / fine_width))
+    cases = np.add.reduceat(cases, starts)
+    population = np.add.reduceat(population, starts)
+    lower = np.asarray(cube.labels[selected_view][0])[starts]
+
+    # Trim the empty bins at either end of the grid.
+    occupied = np.flatnonzero(population)
+    window = slice(occupied[0], occupied[-1] + 1)
+    cases, population, lower = cases[window], population[window], lower[window]
+
+    low, high = ratio_interval(cases, population)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame(
+            {
+                "Bin Start": lower,
+                "Bin End": (lower + bin_width).round(6),
+                "Bin": [f"{start:g}–{start + bin_width:g}" for start in lower],
+                "Number of Cases": cases,
+                "Total Population": population,
+                "Case Share (%)": (cases / cases.sum() * 100).round(2),
+                "Population Share (%)": (population / population.sum() * 100).round(2),
+                "Case Ratio (%)": (cases / population * 100).round(2),
+                "Case Ratio Low (%)": low,
+                "Case Ratio High (%)": high,
+            }
+        )
+
+
+def _median_bin(df: pd.DataFrame, column: str):
+    cumulative = df[column].cumsum()
+    return df["Bin"].iloc[int(np.searchsorted(cumulative, cumulative.iloc[-1] / 2))]
+
+
+def _plot_measure_distribution(
+    df: pd.DataFrame, selected_condition: str, selected_view: str
+):
+    import altair as alt
+
+    cases_label = f"{CONDITION_LABELS[selected_condition]} Cases"
+
+    df_long = df.melt(
+        id_vars=[
+            "Bin Start",
+            "Bin End",
+            "Bin",
+            "Number of Cases",
+            "Total Population",
+            "Case Ratio (%)",
+            "Case Ratio Low (%)",
+            "Case Ratio High (%)",
+        ],
+        value_vars=["Population Share (%)", "Case Share (%)"],
+        var_name="Group",
+        value_name="Share (%)",
+    )
+    df_long["Group"] = df_long["Group"].map(
+        {"Population Share (%)": "All Respondents", "Case Share (%)": cases_label}
+    )
+
+    chart = (
+        alt.Chart(df_long)
+        .mark_bar(opacity=0.55, binSpacing=0)
+        .encode(
+            x=alt.X("Bin Start:Q", title=MEASURE_VIEWS[selected_view]),
+            x2="Bin End:Q",
+            y=alt.Y("Share (%):Q", title="Share of Group (%)", stack=None),
+            color=alt.Color(
+                "Group:N",
+                scale=alt.Scale(
+                    domain=["All Respondents", cases_label],
+                    range=["#9ecae1", "#d62728"],
+                ),
+                legend=alt.Legend(title=None, orient="top"),
+            ),
+            tooltip=[
+                alt.Tooltip("Bin:N", title=MEASURE_VIEWS[selected_view]),
+                "Group",
+                alt.Tooltip("Share (%):Q", format=".2f"),
+                alt.Tooltip("Number of Cases:Q"),
+                alt.Tooltip("Total Population:Q"),
+                alt.Tooltip("Case Ratio (%):Q", format=".2f"),
+                alt.Tooltip("Case Ratio Low (%):Q", format=".2f"),
+                alt.Tooltip("Case Ratio High (%):Q", format=".2f"),
+            ],
+        )
+        .properties(
+            title="",
+            height=350,
+        )
+        .interactive()
+    )
+
+    return chart
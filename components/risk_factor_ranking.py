@@ -0,0 +1,292 @@
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from services.aggregates import FACTOR_COLUMNS, FACTOR_LEVELS, AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import difference_interval, log_ratio_interval
+from services.view_cache import memoize_view
+
+SECTION = "risk_factor_ranking"
+
+# Measure -> (estimate, lower bound, upper bound) columns.
+RISK_MEASURES = {
+    "relative_risk": ("Relative Risk", "Relative Risk Low", "Relative Risk High"),
+    "odds_ratio": ("Odds Ratio", "Odds Ratio Low", "Odds Ratio High"),
+    "prevalence_difference": (
+        "Prevalence Difference (pp)",
+        "Prevalence Difference Low (pp)",
+        "Prevalence Difference High (pp)",
+    ),
+}
+
+FACTOR_TITLES = {
+    "AgeCategory": "Age",
+    "RaceEthnicityCategory": "Race / Ethnicity",
+    "ECigaretteUsage": "E-Cigarette Usage",
+    "HIVTesting": "HIV Testing",
+    "FluVaxLast12": "Flu Vaccine (Last 12 Months)",
+    "PneumoVaxEver": "Pneumonia Vaccine (Ever)",
+    "TetanusLast10Tdap": "Tetanus Vaccine (Last 10 Years)",
+    "HighRiskLastYear": "High Risk Last Year",
+    "CovidPos": "COVID-19 Positive",
+    **CONDITION_LABELS,
+}
+
+# Levels, or the rest of their column, with fewer respondents aren't ranked.
+MIN_LEVEL_POPULATION = 30
+
+# Measure -> effect size at which a level makes no difference.
+NO_EFFECT = {"relative_risk": 1, "odds_ratio": 1, "prevalence_difference": 0}
+
+
+def render_risk_factor_ranking(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    st.markdown(
+        f"##### Which Factors Matter Most for {CONDITION_LABELS[selected_condition]}"
+    )
+
+    selected_measure = st.selectbox(
+        "Rank by:",
+        options=list(RISK_MEASURES.keys()),
+        format_func=lambda x: RISK_MEASURES[x][0],
+        key="risk_factor_measure",
+    )
+
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(
+            cube, selected_condition, selected_measure, selected_state
+        )
+        insight_text = _insight_text(
+            cube, selected_condition, selected_measure, selected_state
+        )
+
+    if df_prepared.empty:
+        st.info("Too few respondents in this selection to rank the factors.")
+        return
+
+    with profile_phase(SECTION, "build"):
+        chart = _plot_risk_factor_ranking(df_prepared, selected_measure)
+
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            st.altair_chart(chart)
+
+        st.markdown(insight_text, unsafe_allow_html=True)
+
+
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_measure: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_prepared = _prepare_data_frame(
+        cube, selected_condition, selected_measure, selected_state
+    )
+    if df_prepared.empty:
+        return ""
+
+    estimate, low, high = RISK_MEASURES[selected_measure]
+    top = df_prepared.iloc[0]
+
+    return f"This chart ranks **every surveyed factor by its strongest association with {CONDITION_LABELS[selected_condition]}**, comparing each answer with all other answers to the same question. <mark>{top['Factor Title']} ({top['Level']}) ranks first ({estimate} {top[estimate]:.2f}, 95% CI {top[low]:.2f}–{top[high]:.2f}): {top['Prevalence (%)']:.2f}% of these respondents have the condition against {top['Rest Prevalence (%)']:.2f}% of the rest</mark>, while factors near the bottom of the ranking show little difference across their answers."
+
+
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_measure: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_levels = _factor_table(cube, tuple(cube.conditions), selected_state)
+    # Cells with an empty side of their 2x2 table only have estimates through
+    # the 0.5 correction, so they aren't ranked.
+    df_levels = df_levels[
+        (df_levels["Condition"] == selected_condition)
+        & (df_levels["Factor"] != selected_condition)
+        & (df_levels["Population"] >= MIN_LEVEL_POPULATION)
+        & (df_levels["Rest Population"] >= MIN_LEVEL_POPULATION)
+        & ~df_levels["Empty Cell"]
+    ]
+
+    # A level's strength is how far its interval stays from no effect: the
+    # gap to the nearer bound, negative when the interval spans no effect.
+    # Ratios are compared on the log scale.
+    _, low, high = RISK_MEASURES[selected_measure]
+    low, high = df_levels[low], df_levels[high]
+    if NO_EFFECT[selected_measure] == 1:
+        with np.errstate(divide="ignore"):
+            low, high = np.log(low), np.log(high)
+    strength = np.maximum(low, -high)
+    df_levels = df_levels.assign(Strength=strength).dropna(subset=["Strength"])
+
+    # Each factor is represented by the answer furthest from no effect.
+    strongest = df_levels.groupby("Factor", sort=False)["Strength"].idxmax()
+
+    return (
+        df_levels.loc[strongest]
+        .sort_values(by="Strength", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+@memoize_view(SECTION)
+def _factor_table(
+    cube: AggregateCube,
+    selected_conditions: tuple[str, ...],
+    selected_state: str | tuple[str, ...] | None,
+):
+    # Every (condition, factor level) cell against the rest of its factor,
+    # in one pass over the condition x level tensor.
+    df_counts = cube.conditions_frame(
+        "factor_levels", list(selected_conditions), selected_state
+    )
+    shape = (len(selected_conditions), len(FACTOR_LEVELS))
+    cases = df_counts["Number of Cases"].to_numpy().reshape(shape)
+    population = df_counts["Total Population"].to_numpy().reshape(shape)
+
+    level_counts = [len(levels) for levels in FACTOR_COLUMNS.values()]
+    offsets = np.cumsum([0, *level_counts[:-1]])
+    rest_cases = (
+        np.repeat(np.add.reduceat(cases, offsets, axis=1), level_counts, axis=1) - cases
+    )
+    rest_population = (
+        np.repeat(np.add.reduceat(population, offsets, axis=1), level_counts, axis=1)
+        - population
+    )
+
+    # The 2x2 table of each cell; an empty cell gets 0.5 added to all four
+    # (Haldane-Anscombe) so its ratios stay finite.
+    a, b = cases, population - cases
+    c, d = rest_cases, rest_population - rest_cases
+    correction = np.where((a == 0) | (b == 0) | (c == 0) | (d == 0), 0.5, 0)
+    a, b, c, d = a + correction, b + correction, c + correction, d + correction
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_relative_risk = np.log(a / (a + b)) - np.log(c / (c + d))
+        relative_risk_error = np.sqrt(1 / a - 1 / (a + b) + 1 / c - 1 / (c + d))
+        log_odds_ratio = np.log(a * d) - np.log(b * c)
+        odds_ratio_error = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+
+        prevalence = cases / population * 100
+        rest_prevalence = rest_cases / rest_population * 100
+
+    relative_risk_low, relative_risk_high = log_ratio_interval(
+        log_relative_risk, relative_risk_error
+    )
+    odds_ratio_low, odds_ratio_high = log_ratio_interval(
+        log_odds_ratio, odds_ratio_error
+    )
+    difference_low, difference_high = difference_interval(
+        cases, population, rest_cases, rest_population
+    )
+
+    factors, levels = zip(*FACTOR_LEVELS)
+
+    return pd.DataFrame(
+        {
+            "Condition": np.repeat(selected_conditions, len(FACTOR_LEVELS)),
+            "Factor": np.tile(factors, len(selected_conditions)),
+            "Factor Title": np.tile(
+                [_factor_title(factor) for factor in factors], len(selected_conditions)
+            ),
+            "Level": np.tile(levels, len(selected_conditions)),
+            "Cases": cases.ravel(),
+            "Population": population.ravel(),
+            "Rest Population": rest_population.ravel(),
+            "Empty Cell": (correction > 0).ravel(),
+            "Prevalence (%)": prevalence.ravel(),
+            "Rest Prevalence (%)": rest_prevalence.ravel(),
+            "Relative Risk": np.exp(log_relative_risk).ravel(),
+            "Relative Risk Low": relative_risk_low.ravel(),
+            "Relative Risk High": relative_risk_high.ravel(),
+            "Odds Ratio": np.exp(log_odds_ratio).ravel(),
+            "Odds Ratio Low": odds_ratio_low.ravel(),
+            "Odds Ratio High": odds_ratio_high.ravel(),
+            "Prevalence Difference (pp)": (prevalence - rest_prevalence).ravel(),
+            "Prevalence Difference Low (pp)": difference_low.ravel(),
+            "Prevalence Difference High (pp)": difference_high.ravel(),
+        }
+    )
+
+
+def _factor_title(factor: str):
+    if factor in FACTOR_TITLES:
+        return FACTOR_TITLES[factor]
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", factor)
+
+
+def _plot_risk_factor_ranking(df: pd.DataFrame, selected_measure: str):
+    import altair as alt
+
+    estimate, low, high = RISK_MEASURES[selected_measure]
+    no_effect = NO_EFFECT[selected_measure]
+
+    df = df.assign(
+        Label=df["Factor Title"] + ": " + df["Level"],
+        Direction=np.where(df[estimate] > no_effect, "Higher risk", "Lower risk"),
+    )
+
+    x_scale = (
+        alt.Scale(zero=False)
+        if selected_measure == "prevalence_difference"
+        else alt.Scale(type="log")
+    )
+    y = alt.Y("Label:N", sort=list(df["Label"]), title=None)
+
+    intervals = (
+        alt.Chart(df)
+        .mark_rule()
+        .encode(
+            x=alt.X(f"{low}:Q", scale=x_scale, title=estimate),
+            x2=f"{high}:Q",
+            y=y,
+            color=alt.Color("Direction:N", legend=None),
+        )
+    )
+    points = (
+        alt.Chart(df)
+        .mark_point(filled=True, size=70)
+        .encode(
+            x=alt.X(f"{estimate}:Q", scale=x_scale),
+            y=y,
+            color=alt.Color(
+                "Direction:N",
+                scale=alt.Scale(
+                    domain=["Higher risk", "Lower risk"], range=["#d62728", "#1f77b4"]
+                ),
+                legend=alt.Legend(title=None, orient="top"),
+            ),
+            tooltip=[
+                alt.Tooltip("Factor Title:N", title="Factor"),
+                "Level",
+                alt.Tooltip(f"{estimate}:Q", format=".2f"),
+                alt.Tooltip(f"{low}:Q", format=".2f"),
+                alt.Tooltip(f"{high}:Q", format=".2f"),
+                alt.Tooltip("Prevalence (%):Q", format=".2f"),
+                alt.Tooltip("Rest Prevalence (%):Q", format=".2f"),
+                alt.Tooltip("Population:Q"),
+            ],
+        )
+    )
+    reference = (
+        alt.Chart(pd.DataFrame({"No Effect": [no_effect]}))
+        .mark_rule(strokeDash=[4, 4], color="gray")
+        .encode(x="No Effect:Q")
+    )
+
+    chart = (intervals + points + reference).properties(
+        title="",
+        height=22 * len(df),
+    )
+
+    return chart
@@ -1,79 +1,94 @@
-import altair as alt
 import pandas as pd
 import streamlit as st
 
+from constants.categories import SMOKER_STATUS_SIMPLE_CATEGORIES
 from constants.conditions import CONDITION_LABELS
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import ratio_interval
+from services.view_cache import memoize_view
+
+SECTION = "smoking_alcohol_interaction"
 
 
 def render_smoking_alcohol_interaction(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
     st.markdown(
         f"##### Smoking & Alcohol Interaction: {CONDITION_LABELS[selected_condition]} Risk"
     )
 
-    df_prepared = _prepare_data_frame(df, selected_condition, selected_state)
+    with profile_phase(SECTION, "prepare"):
+        df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
+        insight_text = _insight_text(cube, selected_condition, selected_state)
 
-    cols = st.columns([3, 2])
+    with profile_phase(SECTION, "build"):
+        chart = _plot_smoking_alcohol_interaction(df_prepared, selected_condition)
 
-    with cols[0].container(border=True):
-        _plot_smoking_alcohol_interaction(df_prepared, selected_condition)
+    with profile_phase(SECTION, "emit"):
+        cols = st.columns([3, 2])
 
-    with cols[1]:
-        highest = df_prepared.loc[df_prepared["Case Ratio (%)"].idxmax()]
-        smoker_status = (
-            "never smokers"
-            if highest["Smoker Status"] == "Never smoked"
-            else f"{str(highest['Smoker Status']).lower()}s"
-        )
-        alcohol_drinkers = (
-            "alcohol-drinking"
-            if highest["Alcohol Drinkers"] == "Yes"
-            else "non-alcohol-drinking"
-        )
+        with cols[0].container(border=True):
+            st.altair_chart(chart)
 
-        st.markdown(
-            f"This chart illustrates the **interaction between smoking status and alcohol consumption in relation to {CONDITION_LABELS[selected_condition]}**, with bubble size and color representing the relative case ratio. <mark>The highest recorded ratio appears for {smoker_status} among {alcohol_drinkers} individuals at approximately {highest['Case Ratio (%)']:0.2f}%</mark>, while other combinations show varying levels, indicating that {CONDITION_LABELS[selected_condition]} prevalence differs across lifestyle behavior pairings.",
-            unsafe_allow_html=True,
-        )
+        with cols[1]:
+            st.markdown(insight_text, unsafe_allow_html=True)
 
 
-def _prepare_data_frame(
-    df: pd.DataFrame, selected_condition: str, selected_state: str | None
+@memoize_view(SECTION)
+def _insight_text(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
 ):
-    df_copy = df.copy()
-
-    if selected_state is not None:
-        df_copy = df_copy[df_copy["State"] == selected_state]
+    df_prepared = _prepare_data_frame(cube, selected_condition, selected_state)
 
-    df_copy["SmokerStatus"] = df_copy["SmokerStatus"].apply(_simplify_smoker_status)
-
-    df_copy.rename(columns={selected_condition: "Total Population"}, inplace=True)
-    df_copy.rename(columns={"AlcoholDrinkers": "Alcohol Drinkers"}, inplace=True)
-    df_copy.rename(columns={"SmokerStatus": "Smoker Status"}, inplace=True)
+    highest = df_prepared.loc[df_prepared["Case Ratio (%)"].idxmax()]
+    smoker_status = (
+        "never smokers"
+        if highest["Smoker Status"] == "Never smoked"
+        else f"{str(highest['Smoker Status']).lower()}s"
+    )
+    alcohol_drinkers = (
+        "alcohol-drinking"
+        if highest["Alcohol Drinkers"] == "Yes"
+        else "non-alcohol-drinking"
+    )
 
-    df_pop = df_copy.groupby(["Alcohol Drinkers", "Smoker Status"], as_index=False)[
-        "Total Population"
-    ].count()
+    return f"This chart illustrates the **interaction between smoking status and alcohol consumption in relation to {CONDITION_LABELS[selected_condition]}**, with bubble size and color representing the relative case ratio. <mark>The highest recorded ratio appears for {smoker_status} among {alcohol_drinkers} individuals at approximately {highest['Case Ratio (%)']:0.2f}%</mark>, while other combinations show varying levels, indicating that {CONDITION_LABELS[selected_condition]} prevalence differs across lifestyle behavior pairings."
 
-    df_copy.rename(columns={"Total Population": "Number of Cases"}, inplace=True)
 
-    df_cases = df_copy[df_copy["Number of Cases"] == "Yes"]
-    df_counts = df_cases.groupby(["Alcohol Drinkers", "Smoker Status"], as_index=False)[
-        "Number of Cases"
-    ].count()
+@memoize_view(SECTION)
+def _prepare_data_frame(
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None,
+):
+    df_risk = cube.frame("smoker_alcohol", selected_condition, selected_state)
+    df_risk.rename(
+        columns={
+            "AlcoholDrinkers": "Alcohol Drinkers",
+            "SmokerStatusSimple": "Smoker Status",
+        },
+        inplace=True,
+    )
 
-    df_risk = df_pop.merge(
-        df_counts, on=["Alcohol Drinkers", "Smoker Status"], how="left"
-    ).fillna(0)
+    df_risk = df_risk[df_risk["Total Population"] > 0].reset_index(drop=True)
     df_risk["Case Ratio (%)"] = (
         df_risk["Number of Cases"] / df_risk["Total Population"] * 100
     ).round(2)
+    df_risk["Case Ratio Low (%)"], df_risk["Case Ratio High (%)"] = ratio_interval(
+        df_risk["Number of Cases"], df_risk["Total Population"]
+    )
 
     return df_risk
 
 
 def _plot_smoking_alcohol_interaction(df: pd.DataFrame, selected_condition: str):
+    import altair as alt
+
     color_scale = alt.Scale(scheme="orangered")
 
     chart = (
@@ -83,7 +98,7 @@ def _plot_smoking_alcohol_interaction(df: pd.DataFrame, selected_condition: str)
             x=alt.X(
                 "Smoker Status:N",
                 title="Smoker Status",
-                sort=["Never smoked", "Former smoker", "Current smoker"],
+                sort=SMOKER_STATUS_SIMPLE_CATEGORIES,
             ),
             y=alt.Y("Alcohol Drinkers:N", title="Alcohol Drinkers"),
             size=alt.Size(
@@ -104,6 +119,8 @@ def _plot_smoking_alcohol_interaction(df: pd.DataFrame, selected_condition: str)
                 "Total Population",
                 "Number of Cases",
                 "Case Ratio (%)",
+                "Case Ratio Low (%)",
+                "Case Ratio High (%)",
             ],
         )
         .properties(
@@ -113,14 +130,4 @@ def _plot_smoking_alcohol_interaction(df: pd.DataFrame, selected_condition: str)
         .interactive()
     )
 
-    st.altair_chart(chart)
-
-
-def _simplify_smoker_status(status):
-    if "Current" in status:
-        return "Current smoker"
-    elif "Former" in status:
-        return "Former smoker"
-    elif "Never" in status:
-        return "Never smoked"
-    return status
+    return chart
@@ -1,37 +1,125 @@
+import os
+
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
+from plotly.colors import sample_colorscale
 
 from constants.conditions import CONDITION_LABELS
+from constants.us_states import CENSUS_REGIONS, STATE_NAME_TO_CODE
+from services.aggregates import AggregateCube
+from services.instrumentation import profile_phase
+from services.intervals import ratio_interval
+from services.view_cache import memoize_view
+
+SECTION = "us_map"
+
+# SLIM_US_MAP=1 emits a lighter figure: binned colors, no template, and a
+# hover that only carries the state and its count.
+SLIM_US_MAP = os.environ.get("SLIM_US_MAP") == "1"
+US_MAP_COLOR_BINS = 7
+
+
+def render_us_map(cube: AggregateCube, selected_condition: str):
+    with profile_phase(SECTION, "prepare"):
+        insight_text = _insight_text(cube, selected_condition)
+
+    with profile_phase(SECTION, "build"):
+        fig = _us_map_figure(cube, selected_condition)
+
+    with profile_phase(SECTION, "emit"):
+        with st.container(border=True):
+            event = st.plotly_chart(
+                fig,
+                use_container_width=True,
+                on_select="rerun",
+                selection_mode=("points", "box", "lasso"),
+            )
+
+        st.markdown(insight_text, unsafe_allow_html=True)
+
+    # Shift-click, box and lasso can pick several states. They're kept as a
+    # sorted tuple so the same set always maps to the same cached views.
+    selected_states = sorted(
+        {point["hovertext"] for point in event.selection["points"]}
+    )
+
+    if len(selected_states) > 1:
+        st.session_state.selected_state = tuple(selected_states)
+    elif len(selected_states) == 1:
+        st.session_state.selected_state = selected_states[0]
+    else:
+        st.session_state.selected_state = None
+
+
+def describe_selection(selected_state: str | tuple[str, ...] | None):
+    if selected_state is None:
+        return "All U.S."
+    if isinstance(selected_state, str):
+        return selected_state
+
+    for region, states in CENSUS_REGIONS.items():
+        if set(states) == set(selected_state):
+            return f"{region} Region"
+
+    if len(selected_state) <= 3:
+        return ", ".join(selected_state)
+    return f"{len(selected_state)} States"
 
 
-def render_us_map(df: pd.DataFrame, selected_condition: str):
-    df_prepared = _prepare_data_frame(df, selected_condition)
+@memoize_view(SECTION)
+def _us_map_figure(cube: AggregateCube, selected_condition: str):
+    # The figure depends only on the condition and the data, so it's built
+    # once and shared; the selection lives in the chart widget's state.
+    df_prepared = _prepare_data_frame(cube, selected_condition)
 
-    with st.container(border=True):
-        _plot_us_map(df_prepared, selected_condition)
+    if SLIM_US_MAP:
+        return _plot_us_map_slim(df_prepared, selected_condition)
+    return _plot_us_map(df_prepared, selected_condition)
+
+
+@memoize_view(SECTION)
+def _insight_text(cube: AggregateCube, selected_condition: str):
+    df_prepared = _prepare_data_frame(cube, selected_condition)
 
     highest = df_prepared.loc[df_prepared[selected_condition].idxmax()]
     lowest = df_prepared.loc[df_prepared[selected_condition].idxmin()]
 
-    st.markdown(
-        f"This map shows the **total number of {CONDITION_LABELS[selected_condition]} cases** across the United States, with <mark>{highest['State']} reporting the highest count ({highest[selected_condition]}) and {lowest['State']} the lowest ({lowest[selected_condition]})</mark>.",
-        unsafe_allow_html=True,
-    )
+    return f"This map shows the **total number of {CONDITION_LABELS[selected_condition]} cases** across the United States, with <mark>{highest['State']} reporting the highest count ({highest[selected_condition]}) and {lowest['State']} the lowest ({lowest[selected_condition]})</mark>."
+
 
+@memoize_view(SECTION)
+def _prepare_data_frame(cube: AggregateCube, selected_condition: str):
+    df_counts = cube.state_frame(selected_condition)
+    df_counts["StateCode"] = df_counts["State"].map(STATE_NAME_TO_CODE)
 
-def _prepare_data_frame(df: pd.DataFrame, selected_condition: str):
-    df_counts = (
-        df[df[selected_condition] == "Yes"]
-        .groupby(["State", "StateCode"])
-        .size()
-        .reset_index(name=selected_condition)
+    df_counts = df_counts[
+        df_counts["StateCode"].notna() & (df_counts["Number of Cases"] > 0)
+    ].reset_index(drop=True)
+
+    df_counts["Case Ratio (%)"] = (
+        df_counts["Number of Cases"] / df_counts["Total Population"] * 100
+    ).round(2)
+    df_counts["Case Ratio Low (%)"], df_counts["Case Ratio High (%)"] = ratio_interval(
+        df_counts["Number of Cases"], df_counts["Total Population"]
     )
 
-    return df_counts
+    return df_counts[
+        [
+            "State",
+            "StateCode",
+            "Number of Cases",
+            "Case Ratio (%)",
+            "Case Ratio Low (%)",
+            "Case Ratio High (%)",
+        ]
+    ].rename(columns={"Number of Cases": selected_condition})
 
 
 def _plot_us_map(df: pd.DataFrame, selected_condition: str):
+    import plotly.express as px
+
     fig = px.choropleth(
         df,
         locations="StateCode",
@@ -39,7 +127,13 @@ def _plot_us_map(df: pd.DataFrame, selected_condition: str):
         color=selected_condition,
         scope="usa",
         hover_name="State",
-        hover_data={"StateCode": False, selected_condition: True},
+        hover_data={
+            "StateCode": False,
+            selected_condition: True,
+            "Case Ratio (%)": True,
+            "Case Ratio Low (%)": True,
+            "Case Ratio High (%)": True,
+        },
         labels={selected_condition: CONDITION_LABELS[selected_condition]},
         color_continuous_scale="Reds",
     )
@@ -48,12 +142,53 @@ def _plot_us_map(df: pd.DataFrame, selected_condition: str):
 
     fig.update_coloraxes(colorbar_title="")
 
-    event = st.plotly_chart(
-        fig, use_container_width=True, on_select="rerun", selection_mode="points"
+    return fig
+
+
+def _plot_us_map_slim(df: pd.DataFrame, selected_condition: str):
+    counts = df[selected_condition].to_numpy()
+    edges = np.unique(
+        np.quantile(counts, np.linspace(0, 1, US_MAP_COLOR_BINS + 1))
+        if len(counts)
+        else [0]
     )
+    bin_count = max(len(edges) - 1, 1)
+    bins = np.clip(np.searchsorted(edges, counts, side="right") - 1, 0, bin_count - 1)
 
-    if len(event.selection["points"]) > 0:
-        selected_state = event.selection["points"][0]["hovertext"]
-        st.session_state.selected_state = selected_state
-    else:
-        st.session_state.selected_state = None
+    colors = sample_colorscale(
+        "Reds", [(i + 0.5) / bin_count for i in range(bin_count)]
+    )
+    colorscale = [
+        [position, color]
+        for i, color in enumerate(colors)
+        for position in (i / bin_count, (i + 1) / bin_count)
+    ]
+
+    fig = go.Figure(
+        go.Choropleth(
+            locations=df["StateCode"],
+            locationmode="USA-states",
+            z=bins,
+            zmin=-0.5,
+            zmax=bin_count - 0.5,
+            colorscale=colorscale,
+            text=counts,
+            hovertext=df["State"],
+            hovertemplate="%{hovertext}: %{text}<extra></extra>",
+            colorbar=dict(
+                tickvals=list(range(bin_count)),
+                ticktext=[
+                    f"{edges[i]:,.0f}-{edges[min(i + 1, len(edges) - 1)]:,.0f}"
+                    for i in range(bin_count)
+                ],
+            ),
+        )
+    )
+
+    fig.update_layout(
+        template="none",
+        geo=dict(scope="usa", showlakes=True, lakecolor="rgb(255,255,255)"),
+        margin=dict(l=0, r=0, t=0, b=0),
+    )
+
+    return fig
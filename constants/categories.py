@@ -0,0 +1,102 @@
+SEX_CATEGORIES = ["Female", "Male"]
+
+YES_NO_CATEGORIES = ["No", "Yes"]
+
+AGE_CATEGORIES = [
+    "Age 18 to 24",
+    "Age 25 to 29",
+    "Age 30 to 34",
+    "Age 35 to 39",
+    "Age 40 to 44",
+    "Age 45 to 49",
+    "Age 50 to 54",
+    "Age 55 to 59",
+    "Age 60 to 64",
+    "Age 65 to 69",
+    "Age 70 to 74",
+    "Age 75 to 79",
+    "Age 80 or older",
+]
+
+AGE_GROUP_SIMPLE_CATEGORIES = ["<45 Years", "45-64 Years", "65-79 Years", ">=80 Years"]
+
+AGE_GROUP_SIMPLE_MAPPING = {
+    "Age 18 to 24": "<45 Years",
+    "Age 25 to 29": "<45 Years",
+    "Age 30 to 34": "<45 Years",
+    "Age 35 to 39": "<45 Years",
+    "Age 40 to 44": "<45 Years",
+    "Age 45 to 49": "45-64 Years",
+    "Age 50 to 54": "45-64 Years",
+    "Age 55 to 59": "45-64 Years",
+    "Age 60 to 64": "45-64 Years",
+    "Age 65 to 69": "65-79 Years",
+    "Age 70 to 74": "65-79 Years",
+    "Age 75 to 79": "65-79 Years",
+    "Age 80 or older": ">=80 Years",
+}
+
+GENERAL_HEALTH_CATEGORIES = ["Poor", "Fair", "Good", "Very good", "Excellent"]
+
+LAST_CHECKUP_TIME_CATEGORIES = [
+    "Within past year (anytime less than 12 months ago)",
+    "Within past 2 years (1 year but less than 2 years ago)",
+    "Within past 5 years (2 years but less than 5 years ago)",
+    "5 or more years ago",
+]
+
+REMOVED_TEETH_CATEGORIES = ["None of them", "1 to 5", "6 or more, but not all", "All"]
+
+SMOKER_STATUS_CATEGORIES = [
+    "Never smoked",
+    "Former smoker",
+    "Current smoker - now smokes some days",
+    "Current smoker - now smokes every day",
+]
+
+SMOKER_STATUS_SIMPLE_CATEGORIES = ["Never smoked", "Former smoker", "Current smoker"]
+
+SMOKER_STATUS_SIMPLE_MAPPING = {
+    "Never smoked": "Never smoked",
+    "Former smoker": "Former smoker",
+    "Current smoker - now smokes some days": "Current smoker",
+    "Current smoker - now smokes every day": "Current smoker",
+}
+
+E_CIGARETTE_USAGE_CATEGORIES = [
+    "Never used e-cigarettes in my entire life",
+    "Not at all (right now)",
+    "Use them some days",
+    "Use them every day",
+]
+
+RACE_ETHNICITY_CATEGORIES = [
+    "White only, Non-Hispanic",
+    "Black only, Non-Hispanic",
+    "Other race only, Non-Hispanic",
+    "Multiracial, Non-Hispanic",
+    "Hispanic",
+]
+
+TETANUS_CATEGORIES = [
+    "No, did not receive any tetanus shot in the past 10 years",
+    "Yes, received tetanus shot but not sure what type",
+    "Yes, received tetanus shot, but not Tdap",
+    "Yes, received Tdap",
+]
+
+COVID_POSITIVE_CATEGORIES = [
+    "No",
+    "Yes",
+    "Tested positive using home test without a health professional",
+]
+
+# Upper bounds of the first three bands; the last band is open-ended.
+BMI_CATEGORY_EDGES = [18.5, 25, 30]
+
+BMI_CATEGORIES = [
+    "Underweight (<18.5)",
+    "Healthy weight (18.5-24.9)",
+    "Overweight (25-29.9)",
+    "Obese (>=30)",
+]
@@ -0,0 +1,64 @@
+import importlib
+
+from services.aggregates import AggregateCube
+
+# The national map; it has no state argument.
+MAP_SECTION = "us_map"
+
+# Detail sections shown for a state selection, keyed by their component
+# module, in page order, with the heading used outside the app.
+DETAIL_SECTIONS = {
+    "risk_percentage_by_age": "Risk Percentage by Age",
+    "case_proportion_by_sex_age": "Case Proportion by Sex and Age",
+    "cases_by_sleep_hours": "Case Distribution by Sleep Hours",
+    "smoking_alcohol_interaction": "Smoking & Alcohol Interaction",
+    "case_ratio_smoking_vs_vape": "Case Ratio: Traditional Smoking vs Vape/E-Cig Use",
+    "case_percentage_by_general_health": "Case Percentage by General Health",
+    "cases_by_physical_activities": "Cases by Physical Activities",
+}
+
+# Detail sections whose _plot_<section> also takes the selected condition.
+CONDITION_CHARTS = {
+    "case_proportion_by_sex_age",
+    "case_ratio_smoking_vs_vape",
+    "smoking_alcohol_interaction",
+}
+
+
+def prepare_section(
+    section: str,
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None = None,
+):
+    # The memoized steps a section's render function reads, for callers
+    # outside the page (warm-up, API): its prepared frame and insight text.
+    module = importlib.import_module(f"components.{section}")
+    args = (
+        (cube, selected_condition)
+        if section == MAP_SECTION
+        else (cube, selected_condition, selected_state)
+    )
+    return module._prepare_data_frame(*args), module._insight_text(*args)
+
+
+def build_section(
+    section: str,
+    cube: AggregateCube,
+    selected_condition: str,
+    selected_state: str | tuple[str, ...] | None = None,
+):
+    # The section's chart and insight text, as rendered on the page.
+    module = importlib.import_module(f"components.{section}")
+    df_prepared, insight_text = prepare_section(
+        section, cube, selected_condition, selected_state
+    )
+
+    if section == MAP_SECTION:
+        chart = module._us_map_figure(cube, selected_condition)
+    elif section in CONDITION_CHARTS:
+        chart = getattr(module, f"_plot_{section}")(df_prepared, selected_condition)
+    else:
+        chart = getattr(module, f"_plot_{section}")(df_prepared)
+
+    return chart, insight_text
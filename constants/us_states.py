@@ -50,3 +50,75 @@ STATE_NAME_TO_CODE = {
     "Wisconsin": "WI",
     "Wyoming": "WY",
 }
+
+STATE_NAMES = sorted(
+    [
+        *STATE_NAME_TO_CODE.keys(),
+        "District of Columbia",
+        "Guam",
+        "Puerto Rico",
+        "Virgin Islands",
+    ]
+)
+
+CENSUS_REGIONS = {
+    "Northeast": [
+        "Connecticut",
+        "Maine",
+        "Massachusetts",
+        "New Hampshire",
+        "New Jersey",
+        "New York",
+        "Pennsylvania",
+        "Rhode Island",
+        "Vermont",
+    ],
+    "Midwest": [
+        "Illinois",
+        "Indiana",
+        "Iowa",
+        "Kansas",
+        "Michigan",
+        "Minnesota",
+        "Missouri",
+        "Nebraska",
+        "North Dakota",
+        "Ohio",
+        "South Dakota",
+        "Wisconsin",
+    ],
+    "South": [
+        "Alabama",
+        "Arkansas",
+        "Delaware",
+        "District of Columbia",
+        "Florida",
+        "Georgia",
+        "Kentucky",
+        "Louisiana",
+        "Maryland",
+        "Mississippi",
+        "North Carolina",
+        "Oklahoma",
+        "South Carolina",
+        "Tennessee",
+        "Texas",
+        "Virginia",
+        "West Virginia",
+    ],
+    "West": [
+        "Alaska",
+        "Arizona",
+        "California",
+        "Colorado",
+        "Hawaii",
+        "Idaho",
+        "Montana",
+        "Nevada",
+        "New Mexico",
+        "Oregon",
+        "Utah",
+        "Washington",
+        "Wyoming",
+    ],
+}
@@ -0,0 +1,471 @@
+import glob
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from constants.categories import YES_NO_CATEGORIES
+from constants.conditions import CONDITION_LABELS
+from services.data_loader import (
+    BOOLEAN_COLUMNS,
+    CATEGORICAL_COLUMNS,
+    dataset_version,
+    load_data,
+    read_data_chunks,
+)
+
+# Numeric columns are counted on a fixed grid of (start, width, bins). The
+# grid is fine enough that any coarser histogram is a sum of adjacent bins;
+# values off the grid are left out like a missing answer.
+NUMERIC_DIMENSION_BINS = {
+    "SleepHours": (0, 1, 25),
+    "BMI": (0, 0.5, 200),
+    "HeightInMeters": (0.5, 0.01, 200),
+    "WeightInKilograms": (0, 1, 300),
+}
+
+NUMERIC_DIMENSION_LABELS = {
+    column: [round(start + position * width, 6) for position in range(bins)]
+    for column, (start, width, bins) in NUMERIC_DIMENSION_BINS.items()
+}
+
+# Every categorical answer and condition on one axis of (column, level)
+# cells. A respondent is counted once per column, so all risk factors come
+# out of a single tensor; the derived simple groupings would only repeat
+# their source columns.
+FACTOR_LEVEL = "FactorLevel"
+
+FACTOR_COLUMNS = {
+    **{
+        column: levels
+        for column, levels in CATEGORICAL_COLUMNS.items()
+        if column != "State"
+    },
+    **{column: YES_NO_CATEGORIES for column in BOOLEAN_COLUMNS},
+}
+
+FACTOR_LEVELS = [
+    (column, level) for column, levels in FACTOR_COLUMNS.items() for level in levels
+]
+
+FACTOR_LEVEL_LABELS = [f"{column}: {level}" for column, level in FACTOR_LEVELS]
+
+VIEW_DIMENSIONS = {
+    "state": [],
+    "age": ["AgeCategory"],
+    "age_sex": ["AgeGroupSimple", "Sex"],
+    "sleep_hours": ["SleepHours"],
+    "smoker_alcohol": ["SmokerStatusSimple", "AlcoholDrinkers"],
+    "smoker_e_cig": ["SmokerStatusSimple", "ECigaretteUsage"],
+    "general_health": ["GeneralHealth"],
+    "physical_activities": ["PhysicalActivities"],
+    "bmi": ["BMI"],
+    "height": ["HeightInMeters"],
+    "weight": ["WeightInKilograms"],
+    "factor_levels": [FACTOR_LEVEL],
+}
+
+
+@dataclass(frozen=True)
+class AggregateCube:
+    states: list[str]
+    conditions: list[str]
+    labels: dict[str, list[list]]
+    population: dict[str, np.ndarray]
+    cases: dict[str, np.ndarray]
+    version: str
+    year: int | None = None
+
+    def counts(
+        self,
+        view: str,
+        selected_condition: str,
+        selected_state: str | tuple[str, ...] | None,
+    ):
+        cases = self.cases[view][self.conditions.index(selected_condition)]
+        population = self.population[view]
+
+        return (
+            self._select_states(cases, selected_state),
+            self._select_states(population, selected_state),
+        )
+
+    def frame(
+        self,
+        view: str,
+        selected_condition: str,
+        selected_state: str | tuple[str, ...] | None,
+    ):
+        cases, population = self.counts(view, selected_condition, selected_state)
+
+        index = pd.MultiIndex.from_product(
+            self.labels[view], names=VIEW_DIMENSIONS[view]
+        )
+
+        return pd.DataFrame(
+            {"Number of Cases": cases.ravel(), "Total Population": population.ravel()},
+            index=index,
+        ).reset_index()
+
+    def conditions_frame(
+        self,
+        view: str,
+        selected_conditions: list[str],
+        selected_state: str | tuple[str, ...] | None,
+    ):
+        # All conditions come out of one slice of the case tensor, stacked on
+        # a leading Condition level.
+        cases = self.cases[view][
+            [self.conditions.index(condition) for condition in selected_conditions]
+        ]
+        cases = self._select_states(cases, selected_state, axis=1)
+        population = self._select_states(self.population[view], selected_state)
+
+        index = pd.MultiIndex.from_product(
+            [selected_conditions, *self.labels[view]],
+            names=["Condition", *VIEW_DIMENSIONS[view]],
+        )
+
+        return pd.DataFrame(
+            {
+                "Number of Cases": cases.ravel(),
+                "Total Population": np.broadcast_to(population, cases.shape).ravel(),
+            },
+            index=index,
+        ).reset_index()
+
+    def _select_states(
+        self,
+        counts: np.ndarray,
+        selected_state: str | tuple[str, ...] | None,
+        axis: int = 0,
+    ):
+        # A set of states (a region or a multi-state map selection) sums its
+        # per-state counts, so it costs the same as one state.
+        if selected_state is None:
+            return counts.sum(axis=axis)
+        if isinstance(selected_state, str):
+            return np.take(counts, self.states.index(selected_state), axis=axis)
+
+        state_indices = [self.states.index(state) for state in selected_state]
+        return np.take(counts, state_indices, axis=axis).sum(axis=axis)
+
+    def state_frame(self, selected_condition: str):
+        return pd.DataFrame(
+            {
+                "State": self.states,
+                "Number of Cases": self.cases["state"][
+                    self.conditions.index(selected_condition)
+                ],
+                "Total Population": self.population["state"],
+            }
+        )
+
+
+def load_cube(path: str):
+    return _load_cube(path, dataset_version(path))
+
+
+@st.cache_data(max_entries=4)
+def _load_cube(path: str, version: str):
+    return build_cube(load_data(path), year=year_from_path(path))
+
+
+def stream_cubes(paths: tuple[str, ...], chunk_rows: int = 500_000):
+    cubes = {}
+    for path in paths:
+        fold_chunks(cubes, read_data_chunks(path, chunk_rows), year_from_path(path))
+    return cubes
+
+
+def fold_chunks(cubes: dict, chunks, default_year: int | None):
+    # Only one chunk of rows is alive at a time; each is folded into the
+    # per-year cube and dropped.
+    for chunk in chunks:
+        for year, df_year in split_years(chunk, default_year):
+            cube = build_cube(df_year, year=year)
+            cubes[year] = merge_cubes([cubes[year], cube]) if year in cubes else cube
+
+    return cubes
+
+
+def merge_cubes(cubes: list[AggregateCube]):
+    population = {
+        view: sum(cube.population[view] for cube in cubes) for view in VIEW_DIMENSIONS
+    }
+    cases = {view: sum(cube.cases[view] for cube in cubes) for view in VIEW_DIMENSIONS}
+
+    return AggregateCube(
+        states=cubes[0].states,
+        conditions=cubes[0].conditions,
+        labels=cubes[0].labels,
+        population=population,
+        cases=cases,
+        version=cube_version(population, cases),
+        year=cubes[0].year,
+    )
+
+
+def year_from_path(path: str):
+    match = re.search(r"(?<!\d)(?:19|20)\d{2}(?!\d)", os.path.basename(path))
+    return int(match.group()) if match else None
+
+
+def load_cube_artifact(path: str):
+    # Keyed on what the path resolves to and when it was written, so a
+    # rebuilt artifact is loaded on the next call.
+    artifact_path = os.path.realpath(path)
+    version_path = (
+        os.path.join(artifact_path, "version.npy")
+        if os.path.isdir(artifact_path)
+        else artifact_path
+    )
+    return _load_cube_artifact(artifact_path, dataset_version(version_path))
+
+
+@st.cache_resource(max_entries=8)
+def _load_cube_artifact(path: str, version: str):
+    # cache_resource hands every session the same object; cache_data would
+    # pickle a copy per call and read memory-mapped tensors into the heap.
+    return read_cube(path)
+
+
+def save_cube(cube: AggregateCube, path: str):
+    arrays = {
+        "states": np.array(cube.states),
+        "conditions": np.array(cube.conditions),
+        "version": np.array(cube.version),
+        "year": np.array(-1 if cube.year is None else cube.year),
+    }
+
+    for view in VIEW_DIMENSIONS:
+        arrays[f"population/{view}"] = cube.population[view]
+        arrays[f"cases/{view}"] = cube.cases[view]
+        for position, view_labels in enumerate(cube.labels[view]):
+            arrays[f"labels/{view}/{position}"] = np.array(view_labels)
+
+    # Artifacts are written beside path and swapped in whole, so a reader
+    # never sees a partial one and memory-mapped files are never rewritten.
+    parent, name = os.path.split(os.path.abspath(path))
+
+    if path.endswith(".npz"):
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", dir=parent)
+        with os.fdopen(fd, "wb") as file:
+            np.savez_compressed(file, **arrays)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+        return
+
+    # Anything else is a directory of plain .npy files that every worker
+    # process can memory-map, sharing one copy through the page cache. path
+    # is a symlink to the latest directory; the previous one is unlinked,
+    # which leaves the files mapped by running processes readable.
+    array_dir = tempfile.mkdtemp(prefix=f".{name}.{cube.version}.", dir=parent)
+    os.chmod(array_dir, 0o755)
+    for array_name, array in arrays.items():
+        array_path = os.path.join(array_dir, f"{array_name}.npy")
+        os.makedirs(os.path.dirname(array_path), exist_ok=True)
+        np.save(array_path, array)
+
+    previous_dir = None
+    if os.path.islink(path):
+        previous_dir = os.path.realpath(path)
+    elif os.path.isdir(path):
+        # A directory written in place by an older build can't be swapped
+        # atomically; it is moved aside first.
+        previous_dir = tempfile.mkdtemp(prefix=f".{name}.old.", dir=parent)
+        os.rename(path, previous_dir)
+
+    link_path = os.path.join(parent, f".{name}.{os.getpid()}.link")
+    os.symlink(os.path.basename(array_dir), link_path)
+    os.replace(link_path, path)
+
+    if previous_dir is not None and os.path.dirname(previous_dir) == parent:
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+
+def read_cube(path: str):
+    if os.path.isdir(path):
+        return _cube_from_arrays(_map_arrays(path))
+
+    with np.load(path) as arrays:
+        return _cube_from_arrays(arrays)
+
+
+def _map_arrays(path: str):
+    return {
+        os.path.relpath(array_path, path)[: -len(".npy")]: np.load(
+            array_path, mmap_mode="r"
+        )
+        for array_path in glob.glob(os.path.join(path, "**", "*.npy"), recursive=True)
+    }
+
+
+def _cube_from_arrays(arrays):
+    return AggregateCube(
+        states=arrays["states"].tolist(),
+        conditions=arrays["conditions"].tolist(),
+        labels={
+            view: [
+                arrays[f"labels/{view}/{position}"].tolist()
+                for position in range(len(dimensions))
+            ]
+            for view, dimensions in VIEW_DIMENSIONS.items()
+        },
+        population={view: arrays[f"population/{view}"] for view in VIEW_DIMENSIONS},
+        cases={view: arrays[f"cases/{view}"] for view in VIEW_DIMENSIONS},
+        version=str(arrays["version"]),
+        year=int(arrays["year"]) if arrays["year"] >= 0 else None,
+    )
+
+
+def build_cube(df: pd.DataFrame, year: int | None = None):
+    states = list(df["State"].cat.categories)
+    conditions = list(CONDITION_LABELS.keys())
+
+    labels = {}
+    population = {}
+    cases = {}
+
+    for view, dimensions in VIEW_DIMENSIONS.items():
+        if dimensions == [FACTOR_LEVEL]:
+            labels[view] = [FACTOR_LEVEL_LABELS]
+            population[view], cases[view] = _factor_level_counts(
+                df, len(states), conditions
+            )
+            continue
+
+        columns = [df["State"], *(df[dimension] for dimension in dimensions)]
+        view_labels = [_labels(column) for column in columns]
+        shape = tuple(len(column_labels) for column_labels in view_labels)
+
+        flat_index = _flat_index(columns, shape)
+
+        # One bincount per condition over (cell, yes/no) yields both the case
+        # count and, summed over yes/no, the population of every cell.
+        counts = np.stack(
+            [
+                _yes_no_counts(flat_index, df[condition], shape)
+                for condition in conditions
+            ]
+        )
+
+        labels[view] = view_labels[1:]
+        population[view] = counts[0].sum(axis=-1)
+        cases[view] = counts[..., 1]
+
+    return AggregateCube(
+        states=states,
+        conditions=conditions,
+        labels=labels,
+        population=population,
+        cases=cases,
+        version=cube_version(population, cases),
+        year=year,
+    )
+
+
+def split_years(df: pd.DataFrame, default_year: int | None):
+    if "Year" not in df.columns:
+        yield default_year, df
+        return
+
+    for year, df_year in df.groupby("Year"):
+        yield int(year), df_year
+
+
+def cube_version(population: dict[str, np.ndarray], cases: dict[str, np.ndarray]):
+    digest = hashlib.blake2b(digest_size=8)
+    for view in VIEW_DIMENSIONS:
+        digest.update(np.ascontiguousarray(population[view]).tobytes())
+        digest.update(np.ascontiguousarray(cases[view]).tobytes())
+    return digest.hexdigest()
+
+
+def _flat_index(columns: list[pd.Series], shape: tuple[int, ...]):
+    flat_index = np.zeros(len(columns[0]), dtype=np.int64)
+    missing = np.zeros(len(columns[0]), dtype=bool)
+
+    for column, length in zip(columns, shape):
+        codes = _codes(column)
+        missing |= codes < 0
+        flat_index *= length
+        flat_index += codes
+
+    # Rows with a missing dimension land in an overflow cell past the cube.
+    flat_index[missing] = np.prod(shape)
+    return flat_index
+
+
+def _factor_level_counts(df: pd.DataFrame, state_count: int, conditions: list[str]):
+    # Every row's yes/no answers to all conditions are packed into one
+    # integer, so a single n-length bincount per factor column counts each
+    # (state, level, answer pattern); a product with the pattern bits then
+    # gives the cases of every condition. Nothing is tiled: peak memory is a
+    # few n-length arrays plus one column's pattern counts.
+    patterns = 1 << len(conditions)
+    pattern_bits = (np.arange(patterns)[:, None] >> np.arange(len(conditions))) & 1
+
+    row_patterns = np.zeros(len(df), dtype=np.int64)
+    for position, condition in enumerate(conditions):
+        row_patterns |= df[condition].to_numpy().astype(np.int64) << position
+
+    states = df["State"].cat.codes.to_numpy().astype(np.int64)
+    population = []
+    cases = []
+
+    for column, levels in FACTOR_COLUMNS.items():
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy().astype(np.int64)
+        else:
+            codes = values.to_numpy(dtype=np.int64)
+
+        size = state_count * len(levels)
+        flat_index = states * len(levels) + codes
+        flat_index[(states < 0) | (codes < 0)] = size
+
+        counts = np.bincount(
+            flat_index * patterns + row_patterns, minlength=(size + 1) * patterns
+        )[: size * patterns].reshape(state_count, len(levels), patterns)
+
+        population.append(counts.sum(axis=-1))
+        cases.append(np.moveaxis(counts @ pattern_bits, -1, 0))
+
+    return np.concatenate(population, axis=-1), np.concatenate(cases, axis=-1)
+
+
+def _yes_no_counts(flat_index: np.ndarray, values: pd.Series, shape: tuple[int, ...]):
+    size = int(np.prod(shape))
+    counts = np.bincount(flat_index * 2 + values.to_numpy(), minlength=2 * size + 2)
+    return counts[: 2 * size].reshape(*shape, 2)
+
+
+def _labels(column: pd.Series):
+    if column.name in NUMERIC_DIMENSION_LABELS:
+        return NUMERIC_DIMENSION_LABELS[column.name]
+    return list(column.cat.categories)
+
+
+def _codes(column: pd.Series):
+    if column.name in NUMERIC_DIMENSION_BINS:
+        start, width, bins = NUMERIC_DIMENSION_BINS[column.name]
+        positions = bin_positions(column.to_numpy(dtype=np.float64), start, width)
+        return np.where((positions >= 0) & (positions < bins), positions, -1).astype(
+            np.int64
+        )
+    return column.cat.codes.to_numpy()
+
+
+def bin_positions(values: np.ndarray, start: float, width: float):
+    # Positions are rounded before the floor: the numeric columns are
+    # float32, whose error at 1 cm bins (1.80 reads back as 1.7999999523)
+    # is far larger than any fixed offset, while 4 decimals of a position
+    # are still well below the data's own precision.
+    return np.floor(np.round((values - start) / width, 4))
@@ -0,0 +1,282 @@
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import product
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from constants.sections import DETAIL_SECTIONS, MAP_SECTION, prepare_section
+from constants.us_states import CENSUS_REGIONS
+from services.aggregates import VIEW_DIMENSIONS
+from services.data_source import load_dashboard_cubes
+from services.view_cache import ViewCache
+
+SECTIONS = [MAP_SECTION, *DETAIL_SECTIONS.keys()]
+
+GZIP_MIN_BYTES = 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AggregatesApi:
+    def __init__(self, load_cubes: Callable[[], dict], max_entries: int = 16384):
+        # load_cubes is called on every request, so a refreshed dataset is
+        # served (under new versions and ETags) as soon as it is loaded.
+        self.load_cubes = load_cubes
+        self.responses = ViewCache(max_entries)
+
+    def handle(self, path: str, query: dict[str, list[str]]):
+        # Every response is keyed by the cube version and the normalized
+        # request, so the ETag is known before anything is computed and a
+        # matching If-None-Match never touches the data.
+        cubes = self.load_cubes()
+        cube = self._cube(cubes, query)
+        endpoint, request = self._parse(path, query)
+        if request:
+            _check_states(cube, request[-1])
+
+        if endpoint == "years":
+            key = (tuple(year_cube.version for year_cube in cubes.values()), endpoint)
+        else:
+            key = (cube.version, endpoint, *request)
+        etag = (
+            '"' + hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest() + '"'
+        )
+
+        return etag, lambda: self.responses.get_or_compute(
+            key, lambda: _encode(self._compute(cubes, cube, endpoint, request))
+        )
+
+    def precompute(self):
+        for year, cube in self.load_cubes().items():
+            for section, condition, state in product(
+                SECTIONS, CONDITION_LABELS, [None, *cube.states]
+            ):
+                if section == MAP_SECTION and state is not None:
+                    continue
+
+                query = {
+                    "year": ["all" if year is None else str(year)],
+                    "condition": [condition],
+                    "state": [] if state is None else [state],
+                }
+                _, respond = self.handle(f"/sections/{section}", query)
+                respond()
+
+    def _cube(self, cubes: dict, query: dict[str, list[str]]):
+        year = query.get("year", [None])[-1]
+        if year is None:
+            year = max(cubes, key=lambda year: -1 if year is None else year)
+        elif year == "all":
+            year = None
+        elif year.isdigit():
+            year = int(year)
+
+        if year not in cubes:
+            raise ApiError(404, f"No data for year {year}")
+        return cubes[year]
+
+    def _parse(self, path: str, query: dict[str, list[str]]):
+        parts = [part for part in path.split("/") if part]
+
+        if parts in (["years"], ["conditions"], ["views"]):
+            return parts[0], ()
+
+        condition = query.get("condition", [None])[-1]
+        if condition not in CONDITION_LABELS:
+            raise ApiError(400, f"Unknown condition {condition!r}")
+
+        state = _state(query)
+
+        if len(parts) == 2 and parts[0] == "aggregates":
+            if parts[1] not in VIEW_DIMENSIONS:
+                raise ApiError(404, f"Unknown view {parts[1]!r}")
+            return "aggregates", (parts[1], condition, state)
+
+        if len(parts) == 2 and parts[0] == "sections":
+            if parts[1] not in SECTIONS:
+                raise ApiError(404, f"Unknown section {parts[1]!r}")
+            # The map is national; a state in the query doesn't change it.
+            if parts[1] == MAP_SECTION:
+                state = None
+            return "sections", (parts[1], condition, state)
+
+        raise ApiError(404, f"Unknown path {path!r}")
+
+    def _compute(self, cubes: dict, cube, endpoint: str, request: tuple):
+        if endpoint == "years":
+            return [
+                {"year": year, "version": year_cube.version}
+                for year, year_cube in cubes.items()
+            ]
+        if endpoint == "conditions":
+            return CONDITION_LABELS
+        if endpoint == "views":
+            return {
+                view: dict(zip(dimensions, cube.labels[view]))
+                for view, dimensions in VIEW_DIMENSIONS.items()
+            }
+
+        name, condition, state = request
+
+        if endpoint == "aggregates":
+            if name == "state":
+                df = cube.state_frame(condition)
+                if state is not None:
+                    states = [state] if isinstance(state, str) else state
+                    df = df[df["State"].isin(states)].reset_index(drop=True)
+            else:
+                df = cube.frame(name, condition, state)
+            return {"records": json.loads(df.to_json(orient="records"))}
+
+        # The section views can't be built for a selection without cases; the
+        # app shows a notice there, the API an empty section saying so.
+        if cube.counts("state", condition, state)[0] == 0:
+            return {
+                "records": [],
+                "insight": "",
+                "error": f"No {CONDITION_LABELS[condition]} cases for this selection",
+            }
+
+        df, insight_text = prepare_section(name, cube, condition, state)
+
+        return {
+            "records": json.loads(df.to_json(orient="records")),
+            "insight": insight_text,
+        }
+
+
+def make_handler(api: AggregatesApi):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+
+            try:
+                etag, respond = api.handle(url.path, parse_qs(url.query))
+
+                if _etag_matches(self.headers.get("If-None-Match"), etag):
+                    self._send(304, b"", etag=etag)
+                    return
+
+                body, gzipped = respond()
+            except ApiError as error:
+                self._send(error.status, json.dumps({"error": str(error)}).encode())
+                return
+            except Exception as error:
+                self._send(500, json.dumps({"error": repr(error)}).encode())
+                return
+
+            if gzipped is not None and "gzip" in self.headers.get(
+                "Accept-Encoding", ""
+            ):
+                self._send(200, gzipped, etag=etag, encoding="gzip")
+            else:
+                self._send(200, body, etag=etag)
+
+        def _send(self, status: int, body: bytes, etag=None, encoding=None):
+            self.send_response(status)
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+            if etag is not None:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Vary", "Accept-Encoding")
+            if encoding is not None:
+                self.send_header("Content-Encoding", encoding)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(
+    load_cubes: Callable[[], dict], host: str = "127.0.0.1", port: int = 8765
+):
+    return ThreadingHTTPServer((host, port), make_handler(AggregatesApi(load_cubes)))
+
+
+@st.cache_resource
+def serve_in_background(port: int):
+    # Started once per Streamlit process when AGGREGATES_API_PORT is set. It
+    # loads the cubes per request the way the app does per rerun, so both
+    # follow a dataset refresh.
+    server = make_server(load_dashboard_cubes, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _state(query: dict[str, list[str]]):
+    region = query.get("region", [None])[-1]
+    if region is not None:
+        if region not in CENSUS_REGIONS:
+            raise ApiError(400, f"Unknown region {region!r}")
+        return tuple(sorted(CENSUS_REGIONS[region]))
+
+    states = sorted(
+        {state for value in query.get("state", []) for state in value.split(",")}
+    )
+    if len(states) > 1:
+        return tuple(states)
+    return states[0] if states else None
+
+
+def _check_states(cube, state: str | tuple[str, ...] | None):
+    for name in [] if state is None else [state] if isinstance(state, str) else state:
+        if name not in cube.states:
+            raise ApiError(400, f"Unknown state {name!r}")
+
+
+def _etag_matches(if_none_match: str | None, etag: str):
+    # If-None-Match is "*" or a comma-separated list of entity tags, compared
+    # weakly: a W/ prefix doesn't stop a match.
+    if if_none_match is None:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+
+def _encode(payload):
+    body = json.dumps(payload).encode()
+    return body, gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the dashboard aggregates as JSON over HTTP. The data "
+        "comes from the same DATA_FILES / AGGREGATES_PATH settings as the app."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--precompute",
+        action="store_true",
+        help="compute every section response before accepting requests",
+    )
+    args = parser.parse_args()
+
+    api = AggregatesApi(load_dashboard_cubes)
+    if args.precompute:
+        api.precompute()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(api))
+    print(f"Serving aggregates on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import time
+
+from services.aggregates import (
+    build_cube,
+    save_cube,
+    split_years,
+    stream_cubes,
+    year_from_path,
+)
+from services.data_loader import read_data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute the dashboard aggregates from the respondent CSV."
+    )
+    parser.add_argument("csv_path", help="path to heart_2022_no_nans.csv")
+    parser.add_argument(
+        "output_path",
+        help="where to write the artifact: a .npz file, or a directory of memory-mappable .npy files",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        help="stream the CSV in chunks of this many rows instead of loading it whole",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    if args.chunk_rows:
+        cubes = stream_cubes((args.csv_path,), args.chunk_rows)
+    else:
+        # A Year column splits the file into one cube per year, as streaming
+        # does.
+        cubes = {
+            year: build_cube(df_year, year=year)
+            for year, df_year in split_years(
+                read_data(args.csv_path), year_from_path(args.csv_path)
+            )
+        }
+
+    for year, cube in cubes.items():
+        output_path = args.output_path
+        if len(cubes) > 1:
+            stem, extension = os.path.splitext(args.output_path)
+            output_path = f"{stem}_{year}{extension}"
+
+        save_cube(cube, output_path)
+        print(f"Wrote aggregates {cube.version} for {year} to {output_path}")
+
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
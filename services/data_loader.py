@@ -1,11 +1,162 @@
+import os
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from constants.us_states import STATE_NAME_TO_CODE
+from constants.categories import (
+    AGE_CATEGORIES,
+    AGE_GROUP_SIMPLE_CATEGORIES,
+    AGE_GROUP_SIMPLE_MAPPING,
+    COVID_POSITIVE_CATEGORIES,
+    E_CIGARETTE_USAGE_CATEGORIES,
+    GENERAL_HEALTH_CATEGORIES,
+    LAST_CHECKUP_TIME_CATEGORIES,
+    RACE_ETHNICITY_CATEGORIES,
+    REMOVED_TEETH_CATEGORIES,
+    SEX_CATEGORIES,
+    SMOKER_STATUS_CATEGORIES,
+    SMOKER_STATUS_SIMPLE_CATEGORIES,
+    SMOKER_STATUS_SIMPLE_MAPPING,
+    TETANUS_CATEGORIES,
+    YES_NO_CATEGORIES,
+)
+from constants.conditions import CONDITION_LABELS
+from constants.us_states import STATE_NAME_TO_CODE, STATE_NAMES
+
+# Condition columns become plain booleans ("Yes" -> True). HadDiabetes also
+# carries borderline/pregnancy answers, which count as False like before.
+BOOLEAN_COLUMNS = list(CONDITION_LABELS.keys())
+
+CATEGORICAL_COLUMNS = {
+    "State": STATE_NAMES,
+    "Sex": SEX_CATEGORIES,
+    "GeneralHealth": GENERAL_HEALTH_CATEGORIES,
+    "LastCheckupTime": LAST_CHECKUP_TIME_CATEGORIES,
+    "PhysicalActivities": YES_NO_CATEGORIES,
+    "RemovedTeeth": REMOVED_TEETH_CATEGORIES,
+    "DeafOrHardOfHearing": YES_NO_CATEGORIES,
+    "BlindOrVisionDifficulty": YES_NO_CATEGORIES,
+    "DifficultyConcentrating": YES_NO_CATEGORIES,
+    "DifficultyWalking": YES_NO_CATEGORIES,
+    "DifficultyDressingBathing": YES_NO_CATEGORIES,
+    "DifficultyErrands": YES_NO_CATEGORIES,
+    "SmokerStatus": SMOKER_STATUS_CATEGORIES,
+    "ECigaretteUsage": E_CIGARETTE_USAGE_CATEGORIES,
+    "ChestScan": YES_NO_CATEGORIES,
+    "RaceEthnicityCategory": RACE_ETHNICITY_CATEGORIES,
+    "AgeCategory": AGE_CATEGORIES,
+    "AlcoholDrinkers": YES_NO_CATEGORIES,
+    "HIVTesting": YES_NO_CATEGORIES,
+    "FluVaxLast12": YES_NO_CATEGORIES,
+    "PneumoVaxEver": YES_NO_CATEGORIES,
+    "TetanusLast10Tdap": TETANUS_CATEGORIES,
+    "HighRiskLastYear": YES_NO_CATEGORIES,
+    "CovidPos": COVID_POSITIVE_CATEGORIES,
+}
+
+INTEGER_COLUMNS = {
+    "PhysicalHealthDays": "uint8",
+    "MentalHealthDays": "uint8",
+    "SleepHours": "uint8",
+}
+
+FLOAT_COLUMNS = {
+    "HeightInMeters": "float32",
+    "WeightInKilograms": "float32",
+    "BMI": "float32",
+}
+
+DERIVED_COLUMNS = {
+    "AgeGroupSimple": (
+        "AgeCategory",
+        AGE_GROUP_SIMPLE_MAPPING,
+        AGE_GROUP_SIMPLE_CATEGORIES,
+    ),
+    "SmokerStatusSimple": (
+        "SmokerStatus",
+        SMOKER_STATUS_SIMPLE_MAPPING,
+        SMOKER_STATUS_SIMPLE_CATEGORIES,
+    ),
+}
 
 
-@st.cache_data
 def load_data(path: str):
-    df = pd.read_csv(path)
+    return _load_data(path, dataset_version(path))
+
+
+def dataset_version(path: str):
+    # File identity from one stat call; a file replaced or appended in place
+    # gets a new version, and with it new cache entries downstream.
+    stat = os.stat(path)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+@st.cache_data(max_entries=4)
+def _load_data(path: str, version: str):
+    return read_data(path)
+
+
+def read_data(path: str):
+    df = pd.read_csv(path, dtype=_read_dtypes())
+    _apply_schema(df)
+    _add_derived_columns(df)
     df["StateCode"] = df["State"].map(STATE_NAME_TO_CODE)
     return df
+
+
+def read_data_chunks(path: str, chunk_rows: int = 500_000, offset: int = 0):
+    # A non-zero offset must be the start of a row; parsing resumes there with
+    # the column names from the header line.
+    with open(path, "rb") as file:
+        names = pd.read_csv(file, nrows=0).columns if offset else None
+        file.seek(offset)
+
+        with pd.read_csv(
+            file,
+            dtype=_read_dtypes(),
+            chunksize=chunk_rows,
+            names=names,
+            header=None if offset else "infer",
+        ) as reader:
+            for chunk in reader:
+                _apply_schema(chunk)
+                _add_derived_columns(chunk)
+                yield chunk
+
+
+def _read_dtypes():
+    dtypes = {column: "category" for column in BOOLEAN_COLUMNS}
+    dtypes.update(
+        {
+            column: pd.CategoricalDtype(categories, ordered=True)
+            for column, categories in CATEGORICAL_COLUMNS.items()
+        }
+    )
+    dtypes.update({column: "float32" for column in INTEGER_COLUMNS})
+    dtypes.update(FLOAT_COLUMNS)
+    return dtypes
+
+
+def _apply_schema(df: pd.DataFrame):
+    for column in BOOLEAN_COLUMNS:
+        df[column] = (df[column] == "Yes").to_numpy()
+
+    for column, dtype in INTEGER_COLUMNS.items():
+        df[column] = df[column].round().astype(dtype)
+
+
+def _add_derived_columns(df: pd.DataFrame):
+    for column, (source, mapping, categories) in DERIVED_COLUMNS.items():
+        # Map each source category to a derived code once, then gather by code;
+        # the trailing -1 keeps missing source values missing.
+        lookup = np.array(
+            [
+                categories.index(mapping[category])
+                for category in df[source].cat.categories
+            ]
+            + [-1]
+        )
+        df[column] = pd.Categorical.from_codes(
+            lookup[df[source].cat.codes.to_numpy()], categories=categories, ordered=True
+        )
@@ -0,0 +1,96 @@
+import glob
+import os
+
+import pandas as pd
+import streamlit as st
+
+from services.aggregates import (
+    load_cube_artifact,
+    merge_cubes,
+    split_years,
+    year_from_path,
+)
+from services.data_loader import dataset_version, read_data_chunks
+from services.dataset_refresh import refresh_cubes
+from services.filter_index import INDEX_COLUMNS, FilterIndex
+from services.sql_backend import load_cubes_sqlite
+
+DEFAULT_DATA_FILES = "data/heart_2022_no_nans.csv"
+DEFAULT_SQLITE_PATH = "data/heart.sqlite"
+
+
+def load_dashboard_cubes():
+    # AGGREGATES_PATH: artifacts from `python -m services.build_aggregates`.
+    # DATA_FILES: CSVs (comma-separated, globs allowed), one survey year each
+    # unless the file has a Year column. They're folded in chunks, and a file
+    # changed in place is picked up on the next rerun; appended rows are
+    # ingested on their own. DATA_BACKEND=sqlite keeps the rows on disk in
+    # SQLITE_PATH (imported from DATA_FILES on first use) and runs every view
+    # as a GROUP BY there.
+    aggregates_path = os.environ.get("AGGREGATES_PATH")
+    if aggregates_path:
+        return _by_year(
+            [load_cube_artifact(path) for path in _expand_paths(aggregates_path)]
+        )
+
+    data_paths = _expand_paths(os.environ.get("DATA_FILES", DEFAULT_DATA_FILES))
+    if os.environ.get("DATA_BACKEND") == "sqlite":
+        return load_cubes_sqlite(
+            os.environ.get("SQLITE_PATH", DEFAULT_SQLITE_PATH), tuple(data_paths)
+        )
+
+    return _by_year(
+        [cube for path in data_paths for cube in refresh_cubes(path).values()]
+    )
+
+
+def load_dashboard_filter_indexes():
+    # Filters need respondent rows, which only the CSV source has. Holding
+    # them costs memory in every process, on top of the cubes, so the panel
+    # is opt-in: FILTER_PANEL=1 loads them.
+    if (
+        os.environ.get("AGGREGATES_PATH")
+        or os.environ.get("DATA_BACKEND") == "sqlite"
+        or os.environ.get("FILTER_PANEL") != "1"
+    ):
+        return {}
+
+    data_paths = _expand_paths(os.environ.get("DATA_FILES", DEFAULT_DATA_FILES))
+    return _load_filter_indexes(
+        tuple(data_paths), tuple(dataset_version(path) for path in data_paths)
+    )
+
+
+@st.cache_resource(max_entries=4)
+def _load_filter_indexes(paths: tuple[str, ...], versions: tuple[str, ...]):
+    # Read in chunks, keeping only the columns the index uses, so the whole
+    # row-level frame is never held at once.
+    frames = {}
+    for path in paths:
+        for chunk in read_data_chunks(path):
+            for year, df_year in split_years(chunk, year_from_path(path)):
+                frames.setdefault(year, []).append(df_year[INDEX_COLUMNS])
+
+    return {
+        year: FilterIndex(pd.concat(year_frames, ignore_index=True), year)
+        for year, year_frames in frames.items()
+    }
+
+
+def _expand_paths(paths: str):
+    expanded = []
+    for pattern in paths.split(","):
+        matches = sorted(glob.glob(pattern.strip()))
+        expanded.extend(matches or [pattern.strip()])
+    return expanded
+
+
+def _by_year(cubes: list):
+    years = {}
+    for cube in cubes:
+        years.setdefault(cube.year, []).append(cube)
+
+    return {
+        year: year_cubes[0] if len(year_cubes) == 1 else merge_cubes(year_cubes)
+        for year, year_cubes in years.items()
+    }
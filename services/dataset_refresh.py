@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+
+from services.aggregates import fold_chunks, stream_cubes, year_from_path
+from services.data_loader import read_data_chunks
+
+FINGERPRINT_BYTES = 1 << 16
+
+
+@dataclass(frozen=True)
+class IngestedFile:
+    size: int
+    mtime_ns: int
+    head_digest: str
+    tail_digest: str
+    cubes: dict
+
+
+_ingested: dict[str, IngestedFile] = {}
+_lock = threading.Lock()
+
+
+def refresh_cubes(path: str, chunk_rows: int = 500_000):
+    # Per-year cubes for a CSV, checked against the file on every call: an
+    # unchanged file costs one stat, appended rows are parsed from the old end
+    # of the file and merged in, and anything else is re-ingested from scratch.
+    with _lock:
+        stat = os.stat(path)
+        previous = _ingested.get(path)
+
+        if previous is not None and (stat.st_size, stat.st_mtime_ns) == (
+            previous.size,
+            previous.mtime_ns,
+        ):
+            return previous.cubes
+
+        if previous is not None and _is_append(path, previous, stat.st_size):
+            cubes = fold_chunks(
+                dict(previous.cubes),
+                read_data_chunks(path, chunk_rows, offset=previous.size),
+                year_from_path(path),
+            )
+        else:
+            cubes = stream_cubes((path,), chunk_rows)
+
+        # A file still being written while it was read may have been parsed
+        # past (or short of) the size seen above; leave it unrecorded so the
+        # next call starts over.
+        after = os.stat(path)
+        if (after.st_size, after.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            _ingested[path] = IngestedFile(
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                head_digest=_digest(path, 0, min(FINGERPRINT_BYTES, stat.st_size)),
+                tail_digest=_digest(
+                    path, max(stat.st_size - FINGERPRINT_BYTES, 0), stat.st_size
+                ),
+                cubes=cubes,
+            )
+        else:
+            _ingested.pop(path, None)
+
+        return cubes
+
+
+def _is_append(path: str, previous: IngestedFile, size: int):
+    # Appending keeps every old byte in place: the header block and the block
+    # that used to end the file must still match, and the old end must have
+    # been a row boundary.
+    if previous.size == 0 or size <= previous.size:
+        return False
+
+    with open(path, "rb") as file:
+        file.seek(previous.size - 1)
+        if file.read(1) != b"\n":
+            return False
+
+    return previous.head_digest == _digest(
+        path, 0, min(FINGERPRINT_BYTES, previous.size)
+    ) and previous.tail_digest == _digest(
+        path, max(previous.size - FINGERPRINT_BYTES, 0), previous.size
+    )
+
+
+def _digest(path: str, start: int, end: int):
+    with open(path, "rb") as file:
+        file.seek(start)
+        return hashlib.blake2b(file.read(end - start), digest_size=16).hexdigest()
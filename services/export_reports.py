@@ -0,0 +1,237 @@
+import argparse
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import altair as alt
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from constants.conditions import CONDITION_LABELS
+from constants.sections import DETAIL_SECTIONS, MAP_SECTION, build_section
+from services.data_source import load_dashboard_cubes
+
+# plotly.js is written once, from the bundle the installed plotly ships,
+# at the root of the export, three levels above each page
+# (year/condition/state); the Vega libraries are the versions altair
+# targets.
+PLOTLY_JS = "plotly.min.js"
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega@{vega}"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@{vega_lite}"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@{vega_embed}"></script>
+<style>body {{ max-width: 900px; margin: auto; font-family: sans-serif; }}</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+_cubes = {}
+
+
+def export_reports(
+    output_dir: str,
+    conditions: list[str],
+    states: list[str | None] | None = None,
+    workers: int | None = None,
+):
+    cubes = load_dashboard_cubes()
+
+    # One task per (year, condition, state); each writes its own directory,
+    # so workers never touch the same file. The national map is exported
+    # once per condition alongside the "All U.S." page.
+    tasks = [
+        (year, condition, state)
+        for year, cube in cubes.items()
+        for condition in conditions
+        for state in (states if states is not None else [None, *cube.states])
+    ]
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, PLOTLY_JS), "w") as output:
+        output.write(get_plotlyjs())
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(cubes,)
+    ) as executor:
+        futures = [executor.submit(_export_page, output_dir, *task) for task in tasks]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            year, condition, state, path = future.result()
+            print(
+                f"[{done}/{len(tasks)}] {year or 'All Data'} / {condition} / "
+                f"{state or 'All U.S.'} -> {path} "
+                f"({time.perf_counter() - started:.1f}s)",
+                flush=True,
+            )
+
+    return len(tasks)
+
+
+def _init_worker(cubes: dict):
+    _cubes.update(cubes)
+
+
+def _export_page(output_dir: str, year: int | None, condition: str, state: str | None):
+    cube = _cubes[year]
+    page_dir = os.path.join(
+        output_dir, str(year or "all"), condition, _slug(state or "All U.S.")
+    )
+    os.makedirs(page_dir, exist_ok=True)
+
+    # The app shows a notice instead of the sections when a selection has no
+    # cases; their views can't be built for it, so the page says the same.
+    if cube.counts("state", condition, state)[0] == 0:
+        note = (
+            f"No {CONDITION_LABELS[condition]} cases reported in "
+            f"{state or 'the U.S.'} for this selection."
+        )
+        with open(os.path.join(page_dir, "views.json"), "w") as output:
+            json.dump(
+                {
+                    "year": year,
+                    "condition": condition,
+                    "state": state,
+                    "views": {},
+                    "note": note,
+                },
+                output,
+            )
+
+        page_path = os.path.join(page_dir, "index.html")
+        with open(page_path, "w") as output:
+            output.write(_page_html(year, condition, state, {}, note))
+
+        return year, condition, state, page_path
+
+    views = {}
+    if state is None:
+        views[MAP_SECTION] = ("U.S. Map", *build_section(MAP_SECTION, cube, condition))
+    for section, title in DETAIL_SECTIONS.items():
+        views[section] = (title, *build_section(section, cube, condition, state))
+
+    specs = {
+        section: {
+            "title": title,
+            "kind": "plotly" if isinstance(chart, go.Figure) else "vega-lite",
+            "spec": _spec(chart),
+            "insight": insight_text,
+        }
+        for section, (title, chart, insight_text) in views.items()
+    }
+
+    with open(os.path.join(page_dir, "views.json"), "w") as output:
+        json.dump(
+            {"year": year, "condition": condition, "state": state, "views": specs},
+            output,
+        )
+
+    page_path = os.path.join(page_dir, "index.html")
+    with open(page_path, "w") as output:
+        output.write(_page_html(year, condition, state, specs))
+
+    return year, condition, state, page_path
+
+
+def _spec(chart):
+    if isinstance(chart, go.Figure):
+        return json.loads(pio.to_json(chart))
+    return chart.to_dict()
+
+
+def _page_html(
+    year: int | None,
+    condition: str,
+    state: str | None,
+    specs: dict,
+    note: str | None = None,
+):
+    title = (
+        f"{CONDITION_LABELS[condition]} - {state or 'All U.S.'} "
+        f"({year or 'All Data'})"
+    )
+
+    parts = [
+        PAGE_HEAD.format(
+            title=html.escape(title),
+            plotly_js=f"../../../{PLOTLY_JS}",
+            vega=alt.VEGA_VERSION,
+            vega_lite=alt.VEGALITE_VERSION,
+            vega_embed=alt.VEGAEMBED_VERSION,
+        )
+    ]
+    if note is not None:
+        parts.append(f"<p>{html.escape(note)}</p>\n")
+    for section, view in specs.items():
+        spec = json.dumps(view["spec"]).replace("</", "<\\/")
+        if view["kind"] == "plotly":
+            draw = f"Plotly.newPlot('{section}', spec.data, spec.layout);"
+        else:
+            draw = f"vegaEmbed('#{section}', spec);"
+
+        parts.append(
+            f"<h3>{html.escape(view['title'])}</h3>\n"
+            f'<div id="{section}"></div>\n'
+            f"<script>{{ const spec = {spec}; {draw} }}</script>\n"
+            f"<p>{_insight_html(view['insight'])}</p>\n"
+        )
+    parts.append("</body>\n</html>\n")
+
+    return "".join(parts)
+
+
+def _insight_html(insight_text: str):
+    # Insights are Streamlit markdown: **bold** plus inline <mark> tags. The
+    # text is escaped first; only those two constructs become markup again.
+    escaped = html.escape(insight_text, quote=False)
+    escaped = escaped.replace("&lt;mark&gt;", "<mark>").replace(
+        "&lt;/mark&gt;", "</mark>"
+    )
+    return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", escaped)
+
+
+def _slug(name: str):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export every condition x state view as static HTML and JSON. "
+        "The data comes from the same DATA_FILES / AGGREGATES_PATH settings as "
+        "the app."
+    )
+    parser.add_argument("output_dir")
+    parser.add_argument(
+        "--conditions",
+        nargs="+",
+        default=list(CONDITION_LABELS.keys()),
+        choices=list(CONDITION_LABELS.keys()),
+    )
+    parser.add_argument(
+        "--states", nargs="+", help="states to export (default: all, plus All U.S.)"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="worker processes (default: one per CPU)"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pages = export_reports(
+        args.output_dir, args.conditions, states=args.states, workers=args.workers
+    )
+    print(f"Exported {pages} pages in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from constants.categories import BMI_CATEGORIES, BMI_CATEGORY_EDGES
+from constants.conditions import CONDITION_LABELS
+from services.aggregates import (
+    FACTOR_COLUMNS,
+    FACTOR_LEVEL,
+    VIEW_DIMENSIONS,
+    build_cube,
+)
+from services.data_loader import CATEGORICAL_COLUMNS
+from services.view_cache import ViewCache
+
+FILTER_COLUMNS = [
+    "Sex",
+    "AgeCategory",
+    "RaceEthnicityCategory",
+    "GeneralHealth",
+    "SmokerStatus",
+    "ECigaretteUsage",
+    "AlcoholDrinkers",
+    "PhysicalActivities",
+    "BMICategory",
+]
+
+# Pseudo-column whose values are condition names; selected conditions are
+# ANDed ("diagnosed with all of"), unlike the values of a column, which are ORed.
+CONDITION_FILTER = "Condition"
+
+CUBE_COLUMNS = sorted(
+    {
+        "State",
+        *CONDITION_LABELS,
+        *FACTOR_COLUMNS,
+        *(d for ds in VIEW_DIMENSIONS.values() for d in ds if d != FACTOR_LEVEL),
+    }
+)
+
+# Every column FilterIndex reads; loaders can drop the rest of each row.
+INDEX_COLUMNS = sorted(
+    {
+        *CUBE_COLUMNS,
+        *(column for column in FILTER_COLUMNS if column != "BMICategory"),
+        "BMI",
+    }
+)
+
+
+class FilterIndex:
+    def __init__(self, df: pd.DataFrame, year: int | None):
+        self.year = year
+        self.rows = len(df)
+        self.values = {
+            column: CATEGORICAL_COLUMNS.get(column, BMI_CATEGORIES)
+            for column in FILTER_COLUMNS
+        }
+        self.values[CONDITION_FILTER] = list(CONDITION_LABELS.keys())
+
+        # One packed bitmap per (column, value): 1 bit per row, so a filter
+        # over any number of columns is a handful of byte-wise ANDs and ORs.
+        self.bitmaps = {}
+        for column in FILTER_COLUMNS:
+            codes = _filter_codes(df, column)
+            for code, value in enumerate(self.values[column]):
+                self.bitmaps[column, value] = np.packbits(codes == code)
+        for condition in CONDITION_LABELS:
+            self.bitmaps[CONDITION_FILTER, condition] = np.packbits(
+                df[condition].to_numpy()
+            )
+
+        self._all_rows = np.packbits(np.ones(self.rows, dtype=bool))
+        self._df = df[CUBE_COLUMNS]
+        self._cubes = ViewCache(32)
+
+    def mask(self, filters: tuple[tuple[str, tuple[str, ...]], ...]):
+        mask = self._all_rows.copy()
+
+        for column, values in filters:
+            if column == CONDITION_FILTER:
+                for value in values:
+                    mask &= self.bitmaps[column, value]
+            else:
+                selected = np.zeros_like(mask)
+                for value in values:
+                    selected |= self.bitmaps[column, value]
+                mask &= selected
+
+        return mask
+
+    def count(self, filters: tuple[tuple[str, tuple[str, ...]], ...]):
+        return int(np.bitwise_count(self.mask(filters)).sum())
+
+    def filtered_cube(self, filters: tuple[tuple[str, tuple[str, ...]], ...]):
+        # The cube for the matching rows feeds every section unchanged; its
+        # content version keys their memoized views like any other cube.
+        return self._cubes.get_or_compute(
+            filters,
+            lambda: build_cube(
+                self._df[
+                    np.unpackbits(self.mask(filters), count=self.rows).astype(bool)
+                ],
+                year=self.year,
+            ),
+        )
+
+
+def normalize_filters(filters: dict[str, list[str]], index: FilterIndex):
+    # A hashable, order-independent key; empty selections don't filter.
+    return tuple(
+        (column, tuple(value for value in index.values[column] if value in values))
+        for column, values in sorted(filters.items())
+        if values
+    )
+
+
+def _filter_codes(df: pd.DataFrame, column: str):
+    if column == "BMICategory":
+        bmi = df["BMI"].to_numpy()
+        return np.where(np.isnan(bmi), -1, np.digitize(bmi, BMI_CATEGORY_EDGES))
+    return df[column].cat.codes.to_numpy()
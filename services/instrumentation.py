@@ -0,0 +1,170 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from services.view_cache import view_cache
+
+logger = logging.getLogger("us_health_visualization.render")
+
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current_run = contextvars.ContextVar("render_profile_run", default=None)
+
+_first_renders = 0
+_first_renders_lock = threading.Lock()
+
+
+class RenderRun:
+    def __init__(self, context: dict):
+        self.context = context
+        self.records = []
+
+
+# RENDER_PROFILING=1 profiles every session; ?debug=1 profiles just one.
+# Allocations are traced only under RENDER_PROFILING=1: tracemalloc counts
+# every thread of the process, so they are process-wide figures, and are
+# only approximate for a phase that overlaps another session's.
+PROCESS_PROFILING = os.environ.get("RENDER_PROFILING") == "1"
+
+
+def profiling_enabled():
+    return PROCESS_PROFILING or st.query_params.get("debug") == "1"
+
+
+def start_render_run(**context):
+    st.session_state.setdefault("first_render_started", time.perf_counter())
+
+    if not profiling_enabled():
+        _current_run.set(None)
+        return None
+
+    if PROCESS_PROFILING and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    run = RenderRun(context)
+    _current_run.set(run)
+    return run
+
+
+def start_fragment_run(**context):
+    # A fragment rerun skips the top of app.py, so it gets a run of its own
+    # (logged only; fragments can't write to the sidebar). On a full run the
+    # fragment just adds to the page's run.
+    script_run = get_script_run_ctx()
+    if script_run is None or not script_run.fragment_ids_this_run:
+        set_render_context(**context)
+        return _current_run.get()
+
+    return start_render_run(fragment=True, **context)
+
+
+def set_render_context(**context):
+    run = _current_run.get()
+    if run is not None:
+        run.context.update(context)
+
+
+@contextmanager
+def profile_phase(section: str, phase: str):
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        allocated_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+
+        record = {
+            "event": "render_phase",
+            "section": section,
+            "phase": phase,
+            "ms": round(elapsed * 1000, 3),
+        }
+        if tracing:
+            allocated_after, peak = tracemalloc.get_traced_memory()
+            record["process_alloc_delta_bytes"] = allocated_after - allocated_before
+            record["process_alloc_peak_bytes"] = peak - allocated_before
+        record.update(run.context)
+        run.records.append(record)
+        logger.info(json.dumps(record))
+
+
+def report_first_render(**context):
+    # Logged once per session, at the end of its first full run. The first
+    # session of a process is the one a cold start would slow down, so it
+    # is flagged for comparison with the ones after it.
+    global _first_renders
+
+    started = st.session_state.get("first_render_started")
+    if started is None or st.session_state.get("first_render_reported"):
+        return
+    st.session_state.first_render_reported = True
+
+    with _first_renders_lock:
+        _first_renders += 1
+        first_in_process = _first_renders == 1
+
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    logger.info(
+        json.dumps(
+            {
+                "event": "first_render",
+                "ms": elapsed_ms,
+                "first_in_process": first_in_process,
+                **context,
+            }
+        )
+    )
+    set_render_context(first_render_ms=elapsed_ms)
+
+
+def render_profile_sidebar(run: RenderRun | None):
+    if run is None or not run.records:
+        return
+
+    df_records = pd.DataFrame(run.records)
+    df_sections = df_records.pivot_table(
+        index="section", columns="phase", values="ms", aggfunc="sum", fill_value=0
+    )
+    df_sections["total"] = df_sections.sum(axis=1)
+
+    with st.sidebar:
+        st.markdown("### Render profile")
+        st.caption(", ".join(f"{key}: {value}" for key, value in run.context.items()))
+        st.dataframe(df_sections.sort_values(by="total", ascending=False).round(2))
+        st.dataframe(
+            df_records.filter(
+                [
+                    "section",
+                    "phase",
+                    "ms",
+                    "process_alloc_delta_bytes",
+                    "process_alloc_peak_bytes",
+                ]
+            ),
+            hide_index=True,
+        )
+        st.markdown("### View cache")
+        st.json(view_cache.stats())
@@ -0,0 +1,194 @@
+import math
+import os
+
+import numpy as np
+
+# INTERVAL_METHOD picks the interval every component shows: "wilson" (the
+# default), "clopper-pearson" or "bootstrap".
+INTERVAL_METHOD = os.environ.get("INTERVAL_METHOD", "wilson")
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 2000
+
+_lgamma = np.vectorize(math.lgamma, otypes=[float])
+
+
+def ratio_interval(
+    cases: np.ndarray, population: np.ndarray, method: str = INTERVAL_METHOD
+):
+    # Interval for cases / population in each cell, as percentages.
+    cases = np.asarray(cases, dtype=float)
+    population = np.asarray(population, dtype=float)
+
+    if method == "bootstrap":
+        # Each cell's respondents are resampled into (case, non-case).
+        rng = np.random.default_rng(0)
+        ratio = np.divide(
+            cases, population, out=np.zeros_like(cases), where=population > 0
+        )
+        resampled = rng.binomial(
+            population.astype(np.int64), ratio, size=(BOOTSTRAP_RESAMPLES, len(cases))
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            low, high = _percentiles(resampled / population)
+    elif method == "clopper-pearson":
+        low, high = _clopper_pearson(cases, population)
+    else:
+        low, high = _wilson(cases, population)
+
+    return _as_percent(low, high, population)
+
+
+def share_interval(cases: np.ndarray, method: str = INTERVAL_METHOD):
+    # Interval for each cell's share of all cases, as percentages.
+    cases = np.asarray(cases, dtype=float)
+    total = np.full_like(cases, cases.sum())
+
+    if method == "bootstrap" and cases.sum() > 0:
+        # The cases are redrawn jointly across cells, so the shares still
+        # sum to one in every resample.
+        rng = np.random.default_rng(0)
+        resampled = rng.multinomial(
+            int(cases.sum()), cases / cases.sum(), size=BOOTSTRAP_RESAMPLES
+        )
+        low, high = _percentiles(resampled / cases.sum())
+        return _as_percent(low, high, total)
+
+    return ratio_interval(
+        cases, total, method="wilson" if method == "bootstrap" else method
+    )
+
+
+def log_ratio_interval(log_ratio: np.ndarray, standard_error: np.ndarray):
+    # Wald interval on the log scale, for relative risks and odds ratios.
+    z = _normal_quantile(1 - (1 - CONFIDENCE) / 2)
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        low = np.exp(log_ratio - z * standard_error)
+        high = np.exp(log_ratio + z * standard_error)
+
+    return low, high
+
+
+def difference_interval(
+    cases: np.ndarray,
+    population: np.ndarray,
+    other_cases: np.ndarray,
+    other_population: np.ndarray,
+):
+    # Wald interval for the difference of two ratios, in percentage points.
+    z = _normal_quantile(1 - (1 - CONFIDENCE) / 2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = cases / population
+        other_ratio = other_cases / other_population
+        half_width = z * np.sqrt(
+            ratio * (1 - ratio) / population
+            + other_ratio * (1 - other_ratio) / other_population
+        )
+
+    difference = ratio - other_ratio
+    return (difference - half_width) * 100, (difference + half_width) * 100
+
+
+def _wilson(successes: np.ndarray, trials: np.ndarray):
+    z = _normal_quantile(1 - (1 - CONFIDENCE) / 2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = successes / trials
+        center = (ratio + z**2 / (2 * trials)) / (1 + z**2 / trials)
+        half_width = (
+            z
+            * np.sqrt(ratio * (1 - ratio) / trials + z**2 / (4 * trials**2))
+            / (1 + z**2 / trials)
+        )
+
+    return center - half_width, center + half_width
+
+
+def _clopper_pearson(successes: np.ndarray, trials: np.ndarray):
+    alpha = 1 - CONFIDENCE
+    failures = trials - successes
+
+    low = _beta_quantile(alpha / 2, np.maximum(successes, 1), failures + 1)
+    high = _beta_quantile(1 - alpha / 2, successes + 1, np.maximum(failures, 1))
+
+    return np.where(successes == 0, 0.0, low), np.where(failures == 0, 1.0, high)
+
+
+def _beta_quantile(q: float, a: np.ndarray, b: np.ndarray, steps: int = 60):
+    # Bisection on the regularized incomplete beta function; 60 halvings of
+    # [0, 1] are well past float precision.
+    low = np.zeros_like(a, dtype=float)
+    high = np.ones_like(a, dtype=float)
+    log_beta = _lgamma(a + b) - _lgamma(a) - _lgamma(b)
+
+    for _ in range(steps):
+        middle = (low + high) / 2
+        below = _beta_cdf(middle, a, b, log_beta) < q
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+
+    return (low + high) / 2
+
+
+def _beta_cdf(x: np.ndarray, a: np.ndarray, b: np.ndarray, log_beta: np.ndarray):
+    # Regularized incomplete beta via its continued fraction, evaluated on
+    # whichever side of the mean converges quickly.
+    flip = x > (a + 1) / (a + b + 2)
+    x, a, b = np.where(flip, 1 - x, x), np.where(flip, b, a), np.where(flip, a, b)
+
+    with np.errstate(divide="ignore"):
+        front = np.exp(log_beta + a * np.log(x) + b * np.log1p(-x))
+    cdf = front * _beta_continued_fraction(x, a, b) / a
+
+    return np.where(flip, 1 - cdf, cdf)
+
+
+def _beta_continued_fraction(
+    x: np.ndarray, a: np.ndarray, b: np.ndarray, max_terms: int = 10_000
+):
+    tiny = 1e-300
+    c = np.ones_like(x)
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+    fraction = d
+
+    for m in range(1, max_terms):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1 + numerator * d
+            d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+            c = 1 + numerator / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            delta = c * d
+            fraction = fraction * delta
+
+        if np.all(np.abs(delta - 1) < 1e-12):
+            break
+
+    return fraction
+
+
+def _normal_quantile(p: float):
+    # Bisection on the normal CDF (math.erf); only called for one p.
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + math.erf(middle / math.sqrt(2))) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def _percentiles(resampled: np.ndarray):
+    alpha = 1 - CONFIDENCE
+    return np.quantile(resampled, [alpha / 2, 1 - alpha / 2], axis=0)
+
+
+def _as_percent(low: np.ndarray, high: np.ndarray, trials: np.ndarray):
+    low = np.where(trials > 0, np.clip(low, 0, 1) * 100, np.nan)
+    high = np.where(trials > 0, np.clip(high, 0, 1) * 100, np.nan)
+    return low.round(2), high.round(2)
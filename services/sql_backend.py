@@ -0,0 +1,251 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from constants.us_states import STATE_NAMES
+from services.aggregates import (
+    FACTOR_COLUMNS,
+    FACTOR_LEVEL,
+    FACTOR_LEVEL_LABELS,
+    NUMERIC_DIMENSION_BINS,
+    NUMERIC_DIMENSION_LABELS,
+    VIEW_DIMENSIONS,
+    AggregateCube,
+    cube_version,
+    year_from_path,
+)
+from services.data_loader import (
+    CATEGORICAL_COLUMNS,
+    DERIVED_COLUMNS,
+    dataset_version,
+    read_data_chunks,
+)
+
+TABLE = "respondents"
+VERSIONS_TABLE = "imported_files"
+
+
+def load_cubes_sqlite(db_path: str, csv_paths: tuple[str, ...]):
+    # The database records the version of every CSV it was imported from;
+    # a changed file gets it rebuilt, and the cubes are cached per versions.
+    return _load_cubes_sqlite(
+        db_path, csv_paths, tuple(dataset_version(path) for path in csv_paths)
+    )
+
+
+@st.cache_data(max_entries=4)
+def _load_cubes_sqlite(
+    db_path: str, csv_paths: tuple[str, ...], versions: tuple[str, ...]
+):
+    if _imported_versions(db_path) != list(zip(csv_paths, versions)):
+        import_csvs(csv_paths, db_path)
+
+    with sqlite3.connect(db_path) as connection:
+        return query_cubes(connection)
+
+
+def import_csvs(csv_paths: tuple[str, ...], db_path: str, chunk_rows: int = 500_000):
+    # Categorical answers are stored as their schema codes (NULL when missing)
+    # so the table stays narrow and GROUP BY keys are small integers. The
+    # import goes to a temporary file that replaces db_path once complete, so
+    # readers never see a partial database.
+    versions = [(path, dataset_version(path)) for path in csv_paths]
+    fd, temp_path = tempfile.mkstemp(
+        suffix=".sqlite", dir=os.path.dirname(os.path.abspath(db_path))
+    )
+    os.close(fd)
+
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            with connection:
+                for path in csv_paths:
+                    for chunk in read_data_chunks(path, chunk_rows):
+                        _to_table_rows(chunk, year_from_path(path)).to_sql(
+                            TABLE, connection, if_exists="append", index=False
+                        )
+
+                connection.execute(
+                    f"CREATE INDEX {TABLE}_year_state ON {TABLE} (Year, State)"
+                )
+                connection.execute(
+                    f"CREATE TABLE {VERSIONS_TABLE} (Path TEXT, Version TEXT)"
+                )
+                connection.executemany(
+                    f"INSERT INTO {VERSIONS_TABLE} VALUES (?, ?)", versions
+                )
+        finally:
+            connection.close()
+
+        os.replace(temp_path, db_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _imported_versions(db_path: str):
+    # (path, version) of each CSV in the database, in import order; None for
+    # a missing database or one without a record of its sources.
+    if not os.path.exists(db_path):
+        return None
+
+    connection = sqlite3.connect(db_path)
+    try:
+        return [
+            tuple(row)
+            for row in connection.execute(
+                f"SELECT Path, Version FROM {VERSIONS_TABLE} ORDER BY rowid"
+            )
+        ]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        connection.close()
+
+
+def query_cubes(connection: sqlite3.Connection):
+    states = STATE_NAMES
+    conditions = list(CONDITION_LABELS.keys())
+    years = [
+        row[0]
+        for row in connection.execute(
+            f"SELECT DISTINCT COALESCE(Year, -1) FROM {TABLE}"
+        )
+    ]
+
+    labels = {
+        view: [_dimension_labels(dimension) for dimension in dimensions]
+        for view, dimensions in VIEW_DIMENSIONS.items()
+    }
+    population = {year: {} for year in years}
+    cases = {year: {} for year in years}
+
+    for view, dimensions in VIEW_DIMENSIONS.items():
+        keys = ["State", *dimensions]
+        shape = (len(states), *(len(view_labels) for view_labels in labels[view]))
+
+        if dimensions == [FACTOR_LEVEL]:
+            # One GROUP BY per factor column, each shifted to its place on
+            # the level axis.
+            query = " UNION ALL ".join(
+                _group_query(["State", f"{offset} + {column}"], [column], conditions)
+                for column, offset in _factor_offsets()
+            )
+        else:
+            query = _group_query(
+                ["State", *(_dimension_key(dimension) for dimension in dimensions)],
+                dimensions,
+                conditions,
+            )
+
+        # The whole aggregation runs inside SQLite; only one row per
+        # (year, state, cell) comes back.
+        rows = np.array(connection.execute(query).fetchall(), dtype=np.int64).reshape(
+            -1, len(keys) + len(conditions) + 2
+        )
+
+        for year in years:
+            year_rows = rows[rows[:, 0] == year]
+            cell = tuple(year_rows[:, 1 : len(keys) + 1].T)
+
+            population[year][view] = np.zeros(shape, dtype=np.int64)
+            population[year][view][cell] = year_rows[:, len(keys) + 1]
+
+            cases[year][view] = np.zeros((len(conditions), *shape), dtype=np.int64)
+            cases[year][view][(slice(None), *cell)] = year_rows[:, len(keys) + 2 :].T
+
+    return {
+        (None if year == -1 else year): AggregateCube(
+            states=states,
+            conditions=conditions,
+            labels=labels,
+            population=population[year],
+            cases=cases[year],
+            version=cube_version(population[year], cases[year]),
+            year=None if year == -1 else year,
+        )
+        for year in years
+    }
+
+
+def _group_query(keys: list[str], columns: list[str], conditions: list[str]):
+    valid = " AND ".join(_valid_clause(column) for column in ["State", *columns])
+    return (
+        f"SELECT COALESCE(Year, -1), {', '.join(keys)}, COUNT(*), "
+        f"{', '.join(f'SUM({condition})' for condition in conditions)} "
+        f"FROM {TABLE} WHERE {valid} "
+        f"GROUP BY 1, {', '.join(keys)}"
+    )
+
+
+def _factor_offsets():
+    offset = 0
+    for column, levels in FACTOR_COLUMNS.items():
+        yield column, offset
+        offset += len(levels)
+
+
+def _to_table_rows(chunk: pd.DataFrame, year: int | None):
+    rows = pd.DataFrame(index=chunk.index)
+    rows["Year"] = chunk["Year"] if "Year" in chunk.columns else year
+
+    for column in chunk.columns:
+        if isinstance(chunk[column].dtype, pd.CategoricalDtype):
+            codes = chunk[column].cat.codes
+            rows[column] = codes.where(codes >= 0).astype("Int16")
+        elif column != "Year":
+            rows[column] = chunk[column]
+
+    return rows
+
+
+def _dimension_labels(dimension: str):
+    if dimension == FACTOR_LEVEL:
+        return FACTOR_LEVEL_LABELS
+    if dimension in NUMERIC_DIMENSION_LABELS:
+        return NUMERIC_DIMENSION_LABELS[dimension]
+    if dimension in DERIVED_COLUMNS:
+        return DERIVED_COLUMNS[dimension][2]
+    return CATEGORICAL_COLUMNS[dimension]
+
+
+def _dimension_key(column: str):
+    # Numeric columns group on their bin position, computed like
+    # bin_positions does.
+    if column in NUMERIC_DIMENSION_BINS:
+        return f"CAST({_bin_position(column)} AS INTEGER)"
+    return column
+
+
+def _valid_clause(column: str):
+    if column in NUMERIC_DIMENSION_BINS:
+        _, _, bins = NUMERIC_DIMENSION_BINS[column]
+        position = _bin_position(column)
+        return f"{position} >= 0 AND {position} < {bins}"
+    return f"{column} IS NOT NULL"
+
+
+def _bin_position(column: str):
+    start, width, _ = NUMERIC_DIMENSION_BINS[column]
+    return f"ROUND(({column} - {start}) / {width}, 4)"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load respondent CSVs into an indexed SQLite database."
+    )
+    parser.add_argument("csv_paths", nargs="+")
+    parser.add_argument("db_path")
+    args = parser.parse_args()
+
+    import_csvs(tuple(args.csv_paths), args.db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+VIEW_CACHE_MAX_ENTRIES = int(os.environ.get("VIEW_CACHE_MAX_ENTRIES", "2048"))
+
+
+class ViewCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: tuple, compute):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+view_cache = ViewCache(VIEW_CACHE_MAX_ENTRIES)
+
+
+def memoize_view(component: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(cube, selected_condition: str, *args):
+            key = (component, func.__name__, cube.version, selected_condition, *args)
+            return view_cache.get_or_compute(
+                key, lambda: func(cube, selected_condition, *args)
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,101 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import streamlit as st
+
+from constants.conditions import CONDITION_LABELS
+from constants.sections import (
+    DETAIL_SECTIONS,
+    MAP_SECTION,
+    build_section,
+    prepare_section,
+)
+from services.data_source import load_dashboard_cubes, load_dashboard_filter_indexes
+from services.instrumentation import logger
+
+# WARM_UP=0 turns the warm-up off. WARM_UP_STATES is how many of the states
+# with the most respondents get their sections precomputed besides "All U.S.".
+WARM_UP = os.environ.get("WARM_UP", "1") != "0"
+WARM_UP_STATES = int(os.environ.get("WARM_UP_STATES", "5"))
+
+# Components import these on first use; the warm-up loads them off the
+# request path.
+CHART_MODULES = ["altair", "plotly.express"]
+
+
+@st.cache_resource
+def start_warm_up():
+    if not WARM_UP:
+        return None
+
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_up_status():
+    thread = start_warm_up()
+    if thread is None:
+        return "off"
+    return "running" if thread.is_alive() else "done"
+
+
+def warm_up(states: int = WARM_UP_STATES):
+    # Fills the same caches a first page view reads: the cubes and filter
+    # indexes, then the map and every detail section for the default year
+    # and condition, nationally and for the most surveyed states.
+    started = time.perf_counter()
+
+    cubes = load_dashboard_cubes()
+    load_dashboard_filter_indexes()
+
+    cube = cubes[max(cubes, key=lambda year: -1 if year is None else year)]
+    condition = next(iter(CONDITION_LABELS))
+    popular_states = [
+        cube.states[index]
+        for index in np.argsort(-cube.population["state"], kind="stable")[:states]
+    ]
+
+    build_section(MAP_SECTION, cube, condition)
+
+    for section in DETAIL_SECTIONS:
+        for state in [None, *popular_states]:
+            prepare_section(section, cube, condition, state)
+
+    for name in CHART_MODULES:
+        importlib.import_module(name)
+
+    logger.info(
+        json.dumps(
+            {
+                "event": "warm_up",
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+                "year": cube.year,
+                "condition": condition,
+                "states": popular_states,
+            }
+        )
+    )
+
+
+def main():
+    # Starts the warm-up before the server, in the same process, so the
+    # first session finds the caches already filled. Arguments are passed
+    # on to `streamlit run app.py`.
+    from streamlit.web import cli
+
+    # Run as a script this module is __main__; the app imports
+    # services.warm_up, so start that copy's cached thread.
+    importlib.import_module("services.warm_up").start_warm_up()
+
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
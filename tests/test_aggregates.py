@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from services.aggregates import (
+    NUMERIC_DIMENSION_BINS,
+    NUMERIC_DIMENSION_LABELS,
+    bin_positions,
+)
+
+
+@pytest.mark.parametrize("column", list(NUMERIC_DIMENSION_BINS))
+def test_bin_edges_land_in_their_own_bin(column):
+    # Every bin's lower edge, stored as float32 like the schema stores it,
+    # must land in that bin and not the one below.
+    start, width, bins = NUMERIC_DIMENSION_BINS[column]
+    edges = np.asarray(NUMERIC_DIMENSION_LABELS[column], dtype=np.float32)
+
+    positions = bin_positions(edges.astype(np.float64), start, width)
+
+    assert (positions == np.arange(bins)).all()